@@ -1,24 +1,40 @@
 import logging
-from datetime import datetime
-from typing import Optional
+import re
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import ContextTypes, ConversationHandler
-
-from database.crud import (
-    get_ad_by_id,
-    update_ad_status,
-    delete_ad,
-    get_pending_ads_count,
-)
+from telegram.ext import ContextTypes, ConversationHandler, CallbackQueryHandler
+
+from database.crud import user_crud, ad_crud, moderation_crud
 from database.models import AdStatus
-from config.settings import settings
+from database.connection import db
+from config import settings
 
 logger = logging.getLogger(__name__)
 
 # Conversation states
 AD_ACTION, CONFIRM_DELETE = range(2)
 
+_MANAGE_AD_RE = re.compile(r'^manage_ad_(\d+)$')
+
+
+def _set_ad_status(update: Update, ad_id: int, status: AdStatus) -> bool:
+    """Moderate ad on behalf of the admin who pressed the button."""
+    with db.get_session() as session:
+        moderator = user_crud.get_or_create(
+            session,
+            update.effective_user.id,
+            username=update.effective_user.username,
+            first_name=update.effective_user.first_name
+        )
+        return ad_crud.moderate_ad(session, ad_id, status, moderator.id) is not None
+
+
+def _delete_ad(ad_id: int) -> bool:
+    """Delete ad regardless of its owner."""
+    with db.get_session() as session:
+        ad = ad_crud.get_ad(session, ad_id)
+        return ad is not None and ad_crud.delete_ad(session, ad_id, ad.owner_id)
+
 
 async def manage_ad(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -29,36 +45,43 @@ async def manage_ad(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     await query.answer()
 
-    try:
-        parts = query.data.split('_')
-        if len(parts) < 3:
-            raise ValueError(f"Invalid callback data format: {query.data}")
-
-        ad_id = int(parts[2])
-        logger.debug(f"Processing ad_id: {ad_id}")
-
-    except (IndexError, ValueError) as e:
-        logger.warning(f"Invalid callback_data received: {query.data}. Error: {e}")
+    match = _MANAGE_AD_RE.match(query.data)
+    if not match:
+        logger.warning(f"Invalid callback_data received: {query.data}")
         await query.edit_message_text(
             "❌ Произошла ошибка при обработке запроса. Пожалуйста, попробуйте еще раз."
         )
         return
 
-    context.user_data['current_ad_id'] = ad_id
+    ad_id = int(match.group(1))
+    logger.debug(f"Processing ad_id: {ad_id}")
 
-    ad = get_ad_by_id(ad_id)
-    if not ad:
-        await query.edit_message_text(
-            "❌ Объявление не найдено. Возможно, оно было удалено."
-        )
-        return
+    context.user_data['current_ad_id'] = ad_id
 
-    user_id = update.effective_user.id
-    if user_id not in settings.ADMIN_IDS:
-        await query.edit_message_text(
-            "⛔ У вас нет прав для управления объявлениями."
+    with db.get_session() as session:
+        ad = ad_crud.get_ad(session, ad_id)
+        if not ad:
+            await query.edit_message_text(
+                "❌ Объявление не найдено. Возможно, оно было удалено."
+            )
+            return
+
+        user_id = update.effective_user.id
+        if user_id not in settings.ADMIN_IDS:
+            await query.edit_message_text(
+                "⛔ У вас нет прав для управления объявлениями."
+            )
+            return
+
+        ad_text = (
+            f"📋 <b>Объявление #{ad_id}</b>\n"
+            f"👤 Пользователь: {ad.owner_id}\n"
+            f"📅 Дата: {ad.created_at.strftime('%Y-%m-%d %H:%M')}\n"
+            f"📝 {ad.title}\n"
+            f"{ad.description[:200]}...\n"
+            f"🔍 Контакты: {ad.contact_info}\n"
+            f"📊 Статус: {ad.status.value}\n"
         )
-        return
 
     keyboard = [
         [
@@ -76,18 +99,6 @@ async def manage_ad(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     reply_markup = InlineKeyboardMarkup(keyboard)
 
-    ad_text = (
-        f"📋 <b>Объявление #{ad_id}</b>\n"
-        f"👤 Пользователь: {ad.user_id}\n"
-        f"📅 Дата: {ad.created_at.strftime('%Y-%m-%d %H:%M')}\n"
-        f"📝 Текст: {ad.text[:200]}...\n"
-        f"🔍 Контакты: {ad.contact_info}\n"
-        f"📊 Статус: {ad.status.value}\n"
-    )
-
-    if ad.photo_url:
-        ad_text += f"🖼️ Фото: {ad.photo_url}\n"
-
     await query.edit_message_text(
         ad_text,
         reply_markup=reply_markup,
@@ -110,7 +121,7 @@ async def approve_ad(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text("❌ Ошибка при обработке запроса.")
         return
 
-    success = update_ad_status(ad_id, AdStatus.APPROVED)
+    success = _set_ad_status(update, ad_id, AdStatus.APPROVED)
 
     if success:
         await query.edit_message_text(
@@ -138,7 +149,7 @@ async def reject_ad(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text("❌ Ошибка при обработке запроса.")
         return
 
-    success = update_ad_status(ad_id, AdStatus.REJECTED)
+    success = _set_ad_status(update, ad_id, AdStatus.REJECTED)
 
     if success:
         await query.edit_message_text(
@@ -205,7 +216,7 @@ async def execute_delete_ad(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text("❌ Удаление отменено.")
         return
 
-    success = delete_ad(ad_id)
+    success = _delete_ad(ad_id)
 
     if success:
         await query.edit_message_text(
@@ -226,7 +237,8 @@ async def back_to_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     await query.answer()
 
-    pending_count = get_pending_ads_count()
+    with db.get_session() as session:
+        pending_count = moderation_crud.get_pending_ads_count(session)
 
     await query.edit_message_text(
         f"📋 Список объявлений ({pending_count} на модерации)\n"
@@ -235,8 +247,19 @@ async def back_to_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    context.user_data.clear()
     await update.message.reply_text(
         "Операция отменена.",
         reply_markup=None
     )
     return ConversationHandler.END
+
+
+def register_handlers(application):
+    """Register ad management handlers."""
+    application.add_handler(CallbackQueryHandler(manage_ad, pattern=r"^manage_ad_\d+$"))
+    application.add_handler(CallbackQueryHandler(approve_ad, pattern=r"^approve_ad_\d+$"))
+    application.add_handler(CallbackQueryHandler(reject_ad, pattern=r"^reject_ad_\d+$"))
+    application.add_handler(CallbackQueryHandler(confirm_delete_ad, pattern=r"^delete_ad_\d+$"))
+    application.add_handler(CallbackQueryHandler(execute_delete_ad, pattern=r"^confirm_delete_(yes|no)_\d+$"))
+    application.add_handler(CallbackQueryHandler(back_to_list, pattern="^back_to_list$"))
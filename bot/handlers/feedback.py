@@ -9,6 +9,7 @@ from telegram.ext import (
 from telegram.constants import ParseMode
 import logging
 from datetime import datetime
+from sqlalchemy.orm import selectinload
 
 from bot.keyboards import inline_keyboards
 from bot.states import FEEDBACK, END
@@ -420,7 +421,9 @@ async def show_my_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
 
             # Get user's feedback.
-            feedbacks = session.query(feedback_crud.Feedback).filter(
+            feedbacks = session.query(feedback_crud.Feedback).options(
+                selectinload(feedback_crud.Feedback.ad)
+            ).filter(
                 feedback_crud.Feedback.user_id == db_user.id
             ).order_by(
                 feedback_crud.Feedback.created_at.desc()
@@ -506,7 +509,10 @@ async def show_feedback_stats(update: Update, context: ContextTypes.DEFAULT_TYPE
             ).first()
 
             # Recent feedback.
-            recent_feedbacks = session.query(feedback_crud.Feedback).join(
+            recent_feedbacks = session.query(feedback_crud.Feedback).options(
+                selectinload(feedback_crud.Feedback.user),
+                selectinload(feedback_crud.Feedback.ad)
+            ).join(
                 user_crud.User
             ).order_by(
                 feedback_crud.Feedback.created_at.desc()
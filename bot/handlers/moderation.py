@@ -4,6 +4,7 @@ from telegram.constants import ParseMode
 import logging
 from datetime import datetime, timedelta
 from typing import Optional
+from sqlalchemy.orm import selectinload
 
 from bot.keyboards import inline_keyboards
 from bot.utils import formatter
@@ -115,6 +116,7 @@ async def moderate_next_ad(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
             ad = queue_entry.ad
             ad_owner = ad.owner
+            owner_ads_count = ad_crud.count_user_ads(session, ad_owner.id)
 
             # Format ad for moderation.
             ad_text = formatter.format_ad_full({
@@ -134,7 +136,7 @@ async def moderate_next_ad(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"• ID: `{ad_owner.telegram_id}`\n"
                 f"• Username: @{ad_owner.username or 'Нет'}\n"
                 f"• Имя: {ad_owner.first_name or 'Нет'}\n"
-                f"• Всего объявлений: {len(ad_owner.ads) if hasattr(ad_owner, 'ads') else 0}\n"
+                f"• Всего объявлений: {owner_ads_count}\n"
                 f"• Статус: {'✅ Активен' if not ad_owner.is_banned else '❌ Заблокирован'}"
             )
 
@@ -390,7 +392,9 @@ async def show_moderation_queue(update: Update, context: ContextTypes.DEFAULT_TY
     try:
         with db.get_session() as session:
             # Get queue with ad details.
-            queue_entries = session.query(moderation_crud.ModerationQueue).join(
+            queue_entries = session.query(moderation_crud.ModerationQueue).options(
+                selectinload(moderation_crud.ModerationQueue.ad)
+            ).join(
                 ad_crud.Ad
             ).order_by(
                 moderation_crud.ModerationQueue.priority.desc(),
@@ -139,26 +139,26 @@ async def notify_users(context: ContextTypes.DEFAULT_TYPE):
                 ad_crud.Ad.created_at >= datetime.now() - timedelta(minutes=10)
             ).all()
 
+            notifications = []
+            notified_query_ids = []
             for ad in recent_ads:
                 # Get search queries that match this ad.
                 matching_queries = search_query_crud.get_queries_for_notification(session, ad)
 
                 for search_query in matching_queries:
-                    # Create notification.
-                    notification_crud.create_notification(
-                        session,
-                        user_id=search_query.user_id,
-                        type="new_ad",
-                        title="Новое объявление по вашему запросу",
-                        content=f"Появилось новое объявление, которое соответствует вашим критериям поиска: '{ad.title}'",
-                        data={"ad_id": ad.id}
-                    )
-
-                    # Update last_notified timestamp.
-                    search_query.last_notified = datetime.now()
-                    session.add(search_query)
-
-                session.commit()
+                    notifications.append({
+                        'user_id': search_query.user_id,
+                        'type': "new_ad",
+                        'title': "Новое объявление по вашему запросу",
+                        'content': f"Появилось новое объявление, которое соответствует вашим критериям поиска: '{ad.title}'",
+                        'data': {"ad_id": ad.id}
+                    })
+                    notified_query_ids.append(search_query.id)
+
+            search_query_crud.mark_notified(session, notified_query_ids)
+
+            # One INSERT for all matches; commits the claims and last_notified too.
+            notification_crud.bulk_create(session, notifications)
 
     except Exception as e:
         logger.error(f"Error in notify_users job: {e}")
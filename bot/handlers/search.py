@@ -40,18 +40,26 @@ async def start_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
-async def execute_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Execute search with current filters."""
-    query = update.callback_query
-    await query.answer()
+def _search_result(ad) -> dict:
+    """Plain dict kept in user_data for one search result."""
+    return {
+        'id': ad.id,
+        'title': ad.title,
+        'description': ad.description,
+        'price': ad.price,
+        'location': ad.location,
+        'created_at': ad.created_at.timestamp(),
+        'owner_id': ad.owner_id
+    }
 
-    filters = context.user_data.get('search_filters', {})
 
-    try:
-        with db.get_session() as session:
-            # Search ads.
-            ads = ad_crud.search_ads(
-                session,
+async def _fetch_results(filters: dict, cursor=None):
+    """Fetch a page of results; returns (ads, next_cursor)."""
+    async with db.get_async_session() as session:
+        if filters.get('keywords'):
+            # Ranked keyword search, one batch of 20.
+            ads = await session.run_sync(
+                ad_crud.search_ads,
                 keywords=filters.get('keywords'),
                 location=filters.get('location'),
                 min_price=filters.get('min_price'),
@@ -59,33 +67,47 @@ async def execute_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 category_id=filters.get('category_id'),
                 limit=20
             )
+            return ads, None
+
+        # Newest first, next batches are fetched by keyset cursor.
+        return await session.run_sync(
+            ad_crud.browse_ads,
+            location=filters.get('location'),
+            min_price=filters.get('min_price'),
+            max_price=filters.get('max_price'),
+            category_id=filters.get('category_id'),
+            limit=20,
+            cursor=cursor
+        )
 
-            if not ads:
-                await query.edit_message_text(
-                    "😔 *Ничего не найдено*\n\n"
-                    "Попробуйте изменить параметры поиска.",
-                    parse_mode=ParseMode.MARKDOWN,
-                    reply_markup=inline_keyboards.search_filters_keyboard()
-                )
-                return
-
-            # Store ads in context for pagination.
-            context.user_data['search_results'] = [
-                {
-                    'id': ad.id,
-                    'title': ad.title,
-                    'description': ad.description,
-                    'price': ad.price,
-                    'location': ad.location,
-                    'created_at': ad.created_at,
-                    'owner_id': ad.owner_id
-                }
-                for ad in ads
-            ]
-            context.user_data['current_search_page'] = 1
-
-            # Show first result.
-            await show_search_results(update, context)
+
+async def execute_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Execute search with current filters."""
+    query = update.callback_query
+    await query.answer()
+
+    filters = context.user_data.get('search_filters', {})
+
+    try:
+        # Search ads without blocking the event loop.
+        ads, next_cursor = await _fetch_results(filters)
+
+        if not ads:
+            await query.edit_message_text(
+                "😔 *Ничего не найдено*\n\n"
+                "Попробуйте изменить параметры поиска.",
+                parse_mode=ParseMode.MARKDOWN,
+                reply_markup=inline_keyboards.search_filters_keyboard()
+            )
+            return
+
+        # Store ads in context for pagination.
+        context.user_data['search_results'] = [_search_result(ad) for ad in ads]
+        context.user_data['search_cursor'] = next_cursor
+        context.user_data['current_search_page'] = 1
+
+        # Show first result.
+        await show_search_results(update, context)
 
     except Exception as e:
         logger.error(f"Error executing search: {e}")
@@ -140,6 +162,12 @@ async def show_search_results(update: Update, context: ContextTypes.DEFAULT_TYPE
             )
         ])
 
+    # On the last loaded page, offer the next batch if the cursor says there is one.
+    if current_page == total_pages and context.user_data.get('search_cursor'):
+        action_buttons.append([
+            inline_keyboards.InlineKeyboardButton("⬇️ Загрузить еще", callback_data="search_more")
+        ])
+
     if action_buttons:
         keyboard = InlineKeyboardMarkup(
             action_buttons + keyboard.inline_keyboard
@@ -159,6 +187,36 @@ async def show_search_results(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
 
 
+async def load_more_results(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Fetch the next batch of results after the stored cursor."""
+    cursor = context.user_data.get('search_cursor')
+    if not cursor:
+        await update.callback_query.answer()
+        return
+
+    filters = context.user_data.get('search_filters', {})
+
+    try:
+        ads, next_cursor = await _fetch_results(filters, cursor=cursor)
+    except Exception as e:
+        logger.error(f"Error loading more search results: {e}")
+        await update.callback_query.answer("😔 Произошла ошибка при поиске.")
+        return
+
+    context.user_data['search_cursor'] = next_cursor
+
+    # Ads after the cursor may have been removed meanwhile: stay on the current
+    # page, which is redrawn without the "load more" button.
+    if ads:
+        results = context.user_data.setdefault('search_results', [])
+        items_per_page = 5
+        # Jump to the first page of the new batch.
+        context.user_data['current_search_page'] = len(results) // items_per_page + 1
+        results.extend(_search_result(ad) for ad in ads)
+
+    await show_search_results(update, context)
+
+
 async def save_search_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Save search query for notifications."""
     query = update.callback_query
@@ -211,3 +269,4 @@ def register_handlers(application):
     application.add_handler(CallbackQueryHandler(execute_search, pattern="^execute_search$"))
     application.add_handler(CallbackQueryHandler(save_search_query, pattern="^save_search$"))
     application.add_handler(CallbackQueryHandler(show_search_results, pattern="^search_page_"))
+    application.add_handler(CallbackQueryHandler(load_more_results, pattern="^search_more$"))
@@ -36,10 +36,10 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
         message = update.message
 
-        # Get or create user in database.
-        with db.get_session() as session:
-            db_user = user_crud.get_or_create(
-                session,
+        # Get or create user in database without blocking the event loop.
+        async with db.get_async_session() as session:
+            db_user = await session.run_sync(
+                user_crud.get_or_create,
                 user.id,
                 username=user.username,
                 first_name=user.first_name,
@@ -1,11 +1,90 @@
 import re
 import logging
-from typing import Optional, List, Dict, Any
-from datetime import datetime
-from decimal import Decimal, InvalidOperation
+import math
+import string
+import time
+import weakref
+from typing import Optional, List, Dict, Any, Union
+from datetime import datetime, timedelta
+
+try:
+    # Linear-time DFA matching, no backtracking on hostile input.
+    import re2 as _regex
+except ImportError:
+    _regex = re
 
 logger = logging.getLogger(__name__)
 
+# Sliding-window rate limit: ARGV = [now, period, limit]; returns 1 if limited.
+_RATE_LIMIT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, tonumber(ARGV[1]) - tonumber(ARGV[2]))
+local count = redis.call('ZCARD', KEYS[1])
+if count >= tonumber(ARGV[3]) then
+    return 1
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 0
+"""
+# Registered Script objects, one per Redis client.
+_RATE_LIMIT_SCRIPTS = weakref.WeakKeyDictionary()
+
+# Only the URL scheme has letters whose case varies.
+_PROHIBITED_TITLE_PATTERNS = [
+    # Inline flag: google-re2's compile() takes an Options object, not re flags.
+    _regex.compile(r"(?i)https?://"),  # URLs.
+    # RE2's \w is ASCII-only; keep stdlib re so Cyrillic tags are caught.
+    re.compile(r"@\w+"),  # Mentions.
+    re.compile(r"#\w+"),  # Hashtags.
+]
+
+_SPAM_PATTERNS = [
+    # RE2's \b is ASCII-only and would never match around Cyrillic words.
+    re.compile(
+        r"\b(?:купи|продам|бесплатно|срочно|только сегодня)\b.*?\b(?:купи|продам|бесплатно|срочно|только сегодня)\b",
+        re.IGNORECASE
+    ),
+    _regex.compile(r"!!!!!!!!+"),
+    _regex.compile(r"\b[A-Z]{5,}\b"),  # ALL CAPS WORDS.
+]
+
+_CONTACT_RE = _regex.compile(
+    r'(?P<tg>@[a-zA-Z0-9_]{5,32})'
+    r'|(?P<phone>\+?[0-9\s\-\(\)]{7,20}|[0-9]{10,11})'
+    r'|(?P<email>[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
+)
+_CONTACT_CHARS = frozenset('@+0123456789')
+_CONTACT_ERROR = "Пожалуйста, укажите действительный контакт (Telegram @username, телефон или email)"
+
+
+# Everything but digits and decimal separators is dropped when cleaning a price.
+_PRICE_JUNK_RE = _regex.compile(r'[^0-9.,]+')
+
+_WS_RE = re.compile(r'\s+')  # Unicode whitespace, which RE2 does not cover.
+_HTML_RE = _regex.compile(r'<[^>]*>')
+_MD_ESCAPE_TABLE = str.maketrans({c: f'\\{c}' for c in '_*[]()~`>#+-=|{}.!'})
+
+_VALID_TOKEN_CHARS = frozenset(string.ascii_letters + string.digits)
+
+_STATUS_EMOJI = {
+    'draft': '📝',
+    'pending': '⏳',
+    'approved': '✅',
+    'rejected': '❌',
+    'rented': '🎉',
+    'archived': '📁'
+}
+
+_TYPE_EMOJI = {
+    'new_ad': '📝',
+    'new_message': '💬',
+    'ad_approved': '✅',
+    'ad_rejected': '❌',
+    'ad_rented': '🎉',
+    'warning': '⚠️',
+    'info': 'ℹ️'
+}
+
 
 class InputValidator:
     """Validator for user input."""
@@ -25,14 +104,8 @@ class InputValidator:
             return False, "Название слишком длинное (максимум 200 символов)"
 
         # Check for prohibited content.
-        prohibited_patterns = [
-            r"http[s]?://",  # URLs.
-            r"@\w+",  # Mentions.
-            r"#\w+",  # Hashtags.
-        ]
-
-        for pattern in prohibited_patterns:
-            if re.search(pattern, title, re.IGNORECASE):
+        for pattern in _PROHIBITED_TITLE_PATTERNS:
+            if pattern.search(title):
                 return False, "Название содержит запрещенные элементы"
 
         return True, title
@@ -52,15 +125,9 @@ class InputValidator:
             return False, "Описание слишком длинное (максимум 5000 символов)"
 
         # Check for spam patterns.
-        spam_patterns = [
-            r"\b(?:купи|продам|бесплатно|срочно|только сегодня)\b.*?\b(?:купи|продам|бесплатно|срочно|только сегодня)\b",
-            r"!!!!!!!!+",
-            r"\b[A-Z]{5,}\b",  # ALL CAPS WORDS.
-        ]
-
-        for pattern in spam_patterns:
-            if re.search(pattern, description, re.IGNORECASE):
-                logger.warning(f"Spam detected in description: {pattern}")
+        for pattern in _SPAM_PATTERNS:
+            if pattern.search(description):
+                logger.warning(f"Spam detected in description: {pattern.pattern}")
                 # Don't reject, just log for moderation.
 
         return True, description
@@ -69,29 +136,33 @@ class InputValidator:
     def validate_price(price_str: str, min_price: float = 0, max_price: float = 1000000) -> tuple[bool, float]:
         """Validate price."""
         try:
-            # Clean the input.
-            price_str = price_str.replace(',', '.').strip()
+            # Fast path: already-clean input such as "1500" or "1500,50".
+            try:
+                price = float(price_str.replace(',', '.'))
+            except ValueError:
+                # Clean the input: ',' -> '.', drop currency symbols and spaces.
+                price_str = _PRICE_JUNK_RE.sub('', price_str).replace(',', '.')
 
-            # Remove currency symbols and extra spaces.
-            price_str = re.sub(r'[^\d.]', '', price_str)
+                if not price_str:
+                    return False, 0
 
-            if not price_str:
-                return False, 0
+                price = float(price_str)
 
-            price = float(price_str)
+            if not math.isfinite(price):
+                raise ValueError(f"Non-finite price: {price}")
 
-            if price < min_price:
+            # Compare in whole kopecks, which also rounds to 2 decimal places.
+            cents = round(price * 100)
+
+            if cents < round(min_price * 100):
                 return False, f"Цена не может быть меньше {min_price}"
 
-            if price > max_price:
+            if cents > round(max_price * 100):
                 return False, f"Цена не может быть больше {max_price}"
 
-            # Round to 2 decimal places.
-            price = round(price, 2)
-
-            return True, price
+            return True, cents / 100
 
-        except (ValueError, InvalidOperation):
+        except ValueError:
             return False, "Неверный формат цены. Используйте числа, например: 1000 или 1500.50"
 
     @staticmethod
@@ -124,30 +195,15 @@ class InputValidator:
         if len(contact_info) > 500:
             return False, "Контактная информация слишком длинная"
 
-        # Check for valid contact methods.
-        has_valid_contact = False
-
-        # Check for Telegram username.
-        if re.search(r'@[a-zA-Z0-9_]{5,32}', contact_info):
-            has_valid_contact = True
-
-        # Check for phone number (various formats).
-        phone_patterns = [
-            r'\+?[0-9\s\-\(\)]{7,20}',  # International and local.
-            r'[0-9]{10,11}',  # Just digits.
-        ]
-
-        for pattern in phone_patterns:
-            if re.search(pattern, contact_info):
-                has_valid_contact = True
-                break
+        # Cheap prefilter: every accepted contact contains '@', '+' or a digit.
+        if not any(c in _CONTACT_CHARS for c in contact_info):
+            return False, _CONTACT_ERROR
 
-        # Check for email.
-        if re.search(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', contact_info):
-            has_valid_contact = True
+        # Telegram username, phone number or email in a single pass.
+        has_valid_contact = _CONTACT_RE.search(contact_info) is not None
 
         if not has_valid_contact:
-            return False, "Пожалуйста, укажите действительный контакт (Telegram @username, телефон или email)"
+            return False, _CONTACT_ERROR
 
         return True, contact_info
 
@@ -161,17 +217,14 @@ class InputValidator:
         text = text.strip()
 
         # Replace multiple spaces with single space.
-        text = re.sub(r'\s+', ' ', text)
+        text = _WS_RE.sub(' ', text)
 
-        # Remove script tags and other HTML.
-        text = re.sub(r'<[^>]*>', '', text)
+        # Remove script tags and other HTML (most messages have no tags at all).
+        if '<' in text:
+            text = _HTML_RE.sub('', text)
 
         # Escape special characters for MarkdownV2.
-        escape_chars = '_*[]()~`>#+-=|{}.!'
-        for char in escape_chars:
-            text = text.replace(char, f'\\{char}')
-
-        return text
+        return text.translate(_MD_ESCAPE_TABLE)
 
 
 class Formatter:
@@ -191,10 +244,7 @@ class Formatter:
         title = ad.get('title', 'Без названия')
         price = ad.get('price', 0)
         location = ad.get('location', 'Не указано')
-        created_at = ad.get('created_at', datetime.now())
-
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        created_at = ad.get('created_at', time.time())
 
         time_ago = Formatter.time_ago(created_at)
 
@@ -215,40 +265,30 @@ class Formatter:
         price = ad.get('price', 0)
         location = ad.get('location', 'Не указано')
         contact_info = ad.get('contact_info', 'Не указаны')
-        created_at = ad.get('created_at', datetime.now())
+        created_at = ad.get('created_at', time.time())
         status = ad.get('status', 'active')
 
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-
         time_ago = Formatter.time_ago(created_at)
 
         # Status emoji.
-        status_emoji = {
-            'draft': '📝',
-            'pending': '⏳',
-            'approved': '✅',
-            'rejected': '❌',
-            'rented': '🎉',
-            'archived': '📁'
-        }.get(status, '❓')
+        status_emoji = _STATUS_EMOJI.get(status, '❓')
 
-        text = (
-            f"{status_emoji} *{Formatter.escape_markdown(title)}*\n\n"
-            f"📋 *Описание:*\n{Formatter.escape_markdown(description)}\n\n"
-            f"💰 *Цена:* {Formatter.format_price(price)}\n"
-            f"📍 *Местоположение:* {Formatter.escape_markdown(location)}\n"
-        )
+        parts = [
+            f"{status_emoji} *{Formatter.escape_markdown(title)}*\n\n",
+            f"📋 *Описание:*\n{Formatter.escape_markdown(description)}\n\n",
+            f"💰 *Цена:* {Formatter.format_price(price)}\n",
+            f"📍 *Местоположение:* {Formatter.escape_markdown(location)}\n",
+        ]
 
         if show_contacts:
-            text += f"📞 *Контакты:* {Formatter.escape_markdown(contact_info)}\n"
+            parts.append(f"📞 *Контакты:* {Formatter.escape_markdown(contact_info)}\n")
         else:
-            text += f"📞 *Контакты:* [Нажмите для просмотра]({ad.get('id')})\n"
+            parts.append(f"📞 *Контакты:* [Нажмите для просмотра]({ad.get('id')})\n")
 
-        text += f"🕐 *Опубликовано:* {time_ago}\n"
-        text += f"🆔 *ID:* `{ad.get('id', 'N/A')}`"
+        parts.append(f"🕐 *Опубликовано:* {time_ago}\n")
+        parts.append(f"🆔 *ID:* `{ad.get('id', 'N/A')}`")
 
-        return text
+        return ''.join(parts)
 
     @staticmethod
     def escape_markdown(text: str) -> str:
@@ -256,31 +296,34 @@ class Formatter:
         if not text:
             return text
 
-        escape_chars = '_*[]()~`>#+-=|{}.!'
-        for char in escape_chars:
-            text = text.replace(char, f'\\{char}')
-
-        return text
+        return text.translate(_MD_ESCAPE_TABLE)
 
     @staticmethod
-    def time_ago(dt: datetime) -> str:
-        """Convert datetime to time ago string."""
-        now = datetime.now(dt.tzinfo) if dt.tzinfo else datetime.now()
-        diff = now - dt
+    def time_ago(when: Union[float, datetime, str]) -> str:
+        """Convert UNIX timestamp (or datetime / ISO string) to time ago string."""
+        if isinstance(when, (int, float)):
+            seconds_ago = math.floor(time.time() - when)
+        else:
+            if isinstance(when, str):
+                when = datetime.fromisoformat(when.replace('Z', '+00:00'))
+            now = datetime.now(when.tzinfo) if when.tzinfo else datetime.now()
+            seconds_ago = (now - when) // timedelta(seconds=1)
+
+        days, seconds = divmod(seconds_ago, 86400)
 
-        if diff.days > 365:
-            years = diff.days // 365
+        if days > 365:
+            years = days // 365
             return f"{years} год{'а' if years % 10 in [2, 3, 4] and years % 100 not in [12, 13, 14] else 'ов'} назад"
-        elif diff.days > 30:
-            months = diff.days // 30
+        elif days > 30:
+            months = days // 30
             return f"{months} месяц{'а' if months % 10 in [2, 3, 4] and months % 100 not in [12, 13, 14] else 'ев'} назад"
-        elif diff.days > 0:
-            return f"{diff.days} день{'я' if diff.days % 10 in [2, 3, 4] and diff.days % 100 not in [12, 13, 14] else 'ей'} назад"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
+        elif days > 0:
+            return f"{days} день{'я' if days % 10 in [2, 3, 4] and days % 100 not in [12, 13, 14] else 'ей'} назад"
+        elif seconds > 3600:
+            hours = seconds // 3600
             return f"{hours} час{'а' if hours % 10 in [2, 3, 4] and hours % 100 not in [12, 13, 14] else 'ов'} назад"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
+        elif seconds > 60:
+            minutes = seconds // 60
             return f"{minutes} минут{'ы' if minutes % 10 in [2, 3, 4] and minutes % 100 not in [12, 13, 14] else ''} назад"
         else:
             return "только что"
@@ -291,60 +334,46 @@ class Formatter:
         n_type = notification.get('type', '')
         title = notification.get('title', '')
         content = notification.get('content', '')
-        created_at = notification.get('created_at', datetime.now())
-
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        created_at = notification.get('created_at', time.time())
 
         time_ago = Formatter.time_ago(created_at)
 
         # Type emoji.
-        type_emoji = {
-            'new_ad': '📝',
-            'new_message': '💬',
-            'ad_approved': '✅',
-            'ad_rejected': '❌',
-            'ad_rented': '🎉',
-            'warning': '⚠️',
-            'info': 'ℹ️'
-        }.get(n_type, '🔔')
-
-        text = f"{type_emoji} "
+        type_emoji = _TYPE_EMOJI.get(n_type, '🔔')
+
+        parts = [f"{type_emoji} "]
 
         if title:
-            text += f"*{Formatter.escape_markdown(title)}*\n\n"
+            parts.append(f"*{Formatter.escape_markdown(title)}*\n\n")
 
-        text += f"{Formatter.escape_markdown(content)}\n\n"
-        text += f"_{time_ago}_"
+        parts.append(f"{Formatter.escape_markdown(content)}\n\n")
+        parts.append(f"_{time_ago}_")
 
-        return text
+        return ''.join(parts)
 
     @staticmethod
     def format_feedback(feedback: Dict[str, Any]) -> str:
         """Format feedback for display"""
         rating = feedback.get('rating', 0)
         comment = feedback.get('comment', '')
-        created_at = feedback.get('created_at', datetime.now())
+        created_at = feedback.get('created_at', time.time())
         user = feedback.get('user', {})
 
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-
         time_ago = Formatter.time_ago(created_at)
         username = user.get('username', 'Аноним')
 
         # Rating stars.
         stars = '⭐' * rating + '☆' * (5 - rating)
 
-        text = f"{stars}\n"
+        parts = [f"{stars}\n"]
 
         if comment:
-            text += f"\n💬 *Комментарий:*\n{Formatter.escape_markdown(comment)}\n"
+            parts.append(f"\n💬 *Комментарий:*\n{Formatter.escape_markdown(comment)}\n")
 
-        text += f"\n👤 *От:* {Formatter.escape_markdown(username)}\n"
-        text += f"🕐 *{time_ago}*"
+        parts.append(f"\n👤 *От:* {Formatter.escape_markdown(username)}\n")
+        parts.append(f"🕐 *{time_ago}*")
 
-        return text
+        return ''.join(parts)
 
 
 class Security:
@@ -366,9 +395,7 @@ class Security:
             return False
 
         # Check if token contains only valid characters.
-        import string
-        valid_chars = string.ascii_letters + string.digits
-        return all(c in valid_chars for c in token)
+        return _VALID_TOKEN_CHARS.issuperset(token)
 
     @staticmethod
     def rate_limit_key(user_id: int, action: str) -> str:
@@ -379,24 +406,14 @@ class Security:
     def is_rate_limited(redis_client, key: str, limit: int, period: int) -> bool:
         """Check if user is rate limited."""
         try:
-            import time
             current = int(time.time())
-            window_start = current - period
-
-            # Remove old entries.
-            redis_client.zremrangebyscore(key, 0, window_start)
 
-            # Count requests in current window.
-            request_count = redis_client.zcard(key)
-
-            if request_count >= limit:
-                return True
-
-            # Add current request.
-            redis_client.zadd(key, {str(current): current})
-            redis_client.expire(key, period)
-
-            return False
+            # Sliding window runs atomically on the Redis side in one round-trip.
+            script = _RATE_LIMIT_SCRIPTS.get(redis_client)
+            if script is None:
+                script = redis_client.register_script(_RATE_LIMIT_SCRIPT)
+                _RATE_LIMIT_SCRIPTS[redis_client] = script
+            return bool(script(keys=[key], args=[current, period, limit]))
         except Exception as e:
             logger.error(f"Rate limit check failed: {e}")
             return False  # Don't limit if Redis fails.
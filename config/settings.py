@@ -43,6 +43,31 @@ class Settings(BaseSettings):
         description="PostgreSQL connection URL"
     )
 
+    DB_ECHO: bool = Field(
+        default=False,
+        description="Log all SQL statements"
+    )
+    DB_POOL_SIZE: int = Field(
+        default=10,
+        description="Number of persistent connections in the pool"
+    )
+    DB_MAX_OVERFLOW: int = Field(
+        default=20,
+        description="Extra connections allowed above the pool size"
+    )
+    DB_POOL_TIMEOUT: int = Field(
+        default=30,
+        description="Seconds to wait for a free pooled connection"
+    )
+    DB_POOL_RECYCLE: int = Field(
+        default=1800,
+        description="Seconds after which pooled connections are reopened"
+    )
+    DB_QUERY_CACHE_SIZE: int = Field(
+        default=1200,
+        description="Size of the SQLAlchemy compiled statement cache"
+    )
+
     ADMIN_IDS: List[int] = Field(
         default_factory=list,
         description="Comma-separated list of admin user IDs",
@@ -1,6 +1,8 @@
 import logging
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
+from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session, Load
 from sqlalchemy.pool import QueuePool
 
 from config.settings import settings
@@ -9,10 +11,35 @@ from database.models import Base
 logger = logging.getLogger(__name__)
 
 
+def _raise_on_lazy_load(orm_execute_state):
+    # Debug aid: any relationship not eagerly loaded by the query raises instead of
+    # silently issuing one SELECT per row.
+    if (
+        not orm_execute_state.is_select
+        or orm_execute_state.is_column_load
+        or orm_execute_state.is_relationship_load
+    ):
+        return
+
+    # One option per selected entity: a bare raiseload('*') is rejected for
+    # column-only and multi-entity selects.
+    entities = [
+        column['entity']
+        for column in orm_execute_state.statement.column_descriptions
+        if column['entity'] is not None and column['expr'] is column['entity']
+    ]
+    if entities:
+        orm_execute_state.statement = orm_execute_state.statement.options(
+            *(Load(entity).raiseload('*', sql_only=True) for entity in entities)
+        )
+
+
 class Database:
     def __init__(self):
         self.engine = None
         self.SessionLocal = None
+        self.async_engine = None
+        self.AsyncSessionLocal = None
         self._init_engine()
 
     def _init_engine(self):
@@ -23,23 +50,67 @@ class Database:
                 poolclass=QueuePool,
                 pool_size=settings.DB_POOL_SIZE,
                 max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
                 pool_pre_ping=True,
+                query_cache_size=settings.DB_QUERY_CACHE_SIZE,
             )
-            self.SessionLocal = scoped_session(
-                sessionmaker(
-                    autocommit=False,
-                    autoflush=False,
-                    bind=self.engine
-                )
+            # Objects keep their state after commit; INSERT ... RETURNING already
+            # brings back server defaults, so CRUD writes skip refresh().
+            session_factory = sessionmaker(
+                autocommit=False,
+                autoflush=False,
+                expire_on_commit=False,
+                bind=self.engine
             )
+            if settings.DEBUG:
+                event.listen(session_factory, 'do_orm_execute', _raise_on_lazy_load)
+            self.SessionLocal = scoped_session(session_factory)
             logger.info("Database engine initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize database engine: {e}")
             raise
 
+    def _init_async_engine(self):
+        # Created on first use so importing db does not require asyncpg.
+        try:
+            self.async_engine = create_async_engine(
+                settings.DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://', 1),
+                echo=settings.DB_ECHO,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_pre_ping=True,
+                query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+            )
+            self.AsyncSessionLocal = async_sessionmaker(
+                self.async_engine,
+                autoflush=False,
+                expire_on_commit=False
+            )
+            logger.info("Async database engine initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize async database engine: {e}")
+            raise
+
+    def warm_pool(self):
+        # Open pool_size connections up front so the first handlers don't pay for connect().
+        connections = [self.engine.connect() for _ in range(settings.DB_POOL_SIZE)]
+        for connection in connections:
+            connection.close()
+        logger.info(f"Database pool warmed with {len(connections)} connections")
+
     def get_session(self):
         return self.SessionLocal()
 
+    @asynccontextmanager
+    async def get_async_session(self):
+        if self.AsyncSessionLocal is None:
+            self._init_async_engine()
+        async with self.AsyncSessionLocal() as session:
+            yield session
+
     def close_session(self, session):
         if session:
             session.close()
@@ -49,5 +120,10 @@ class Database:
             self.engine.dispose()
             logger.info("Database engine disposed")
 
+    async def dispose_async_engine(self):
+        if self.async_engine:
+            await self.async_engine.dispose()
+            logger.info("Async database engine disposed")
+
 
 db = Database()
@@ -1,52 +1,169 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, desc, func, extract
-from typing import List, Optional, Dict, Any
+from sqlalchemy.orm import Session, selectinload, joinedload
+from sqlalchemy import or_, and_, desc, func, extract, insert, update, delete, select, literal, literal_column, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
+from contextvars import ContextVar
 import logging
 from .models import (
     User, Ad, AdStatus, Category, Message, Feedback,
-    SearchQuery, Notification, ModerationQueue, UserRole
+    SearchQuery, Notification, ModerationQueue, UserRole, NotifiedAd
 )
 from .connection import db
+from dogpile.cache import make_region
 
 logger = logging.getLogger(__name__)
 
+# Near-static reference data (categories) is cached in process memory.
+category_cache = make_region().configure('dogpile.cache.memory', expiration_time=3600)
+
+# Moderation queue badge; short TTL and dropped whenever the queue changes.
+moderation_cache = make_region().configure('dogpile.cache.memory', expiration_time=5)
+
+# Generated tsvector over title + description, maintained by the migrations.
+AD_SEARCH_TSV = literal_column('ads.search_tsv')
+
+
+def _like_contains(column):
+    """'%value%' pattern built in SQL from a column, with LIKE wildcards in the value escaped."""
+    escaped = func.replace(func.replace(func.replace(column, '\\', '\\\\'), '%', '\\%'), '_', '\\_')
+    return '%' + escaped + '%'
+
+
+# Per-update lookup cache; main.py starts a fresh one for every Telegram update.
+# Outside an update (scheduler jobs, scripts) it stays None and nothing is cached.
+_user_cache: ContextVar[Optional[Dict[Any, Any]]] = ContextVar('user_cache', default=None)
+
 
 # User CRUD operations.
 class UserCRUD:
+    @staticmethod
+    def reset_cache():
+        """Start an empty user cache for the current update."""
+        _user_cache.set({})
+
+    @staticmethod
+    def _cached_user(session: Session, key):
+        cache = _user_cache.get()
+        if cache is None or key not in cache:
+            return None, cache
+        # Re-attach the already loaded row to this session without a SELECT.
+        return session.merge(cache[key], load=False), cache
+
     @staticmethod
     def get_or_create(session: Session, telegram_id: int, **kwargs):
         """Get user by telegram_id or create if not exists."""
+        user, cache = UserCRUD._cached_user(session, ('telegram_id', telegram_id))
+        if user is not None:
+            return user
+
         user = session.query(User).filter(User.telegram_id == telegram_id).first()
         if not user:
             user = User(telegram_id=telegram_id, **kwargs)
             session.add(user)
             session.commit()
-            session.refresh(user)
+
+        if cache is not None:
+            cache[('telegram_id', telegram_id)] = user
         return user
 
     @staticmethod
     def get_by_id(session: Session, user_id: int):
         """Get user by id."""
-        return session.query(User).filter(User.id == user_id).first()
+        user, cache = UserCRUD._cached_user(session, ('id', user_id))
+        if user is not None:
+            return user
+
+        user = session.query(User).filter(User.id == user_id).first()
+        if user is not None and cache is not None:
+            cache[('id', user_id)] = user
+        return user
 
     @staticmethod
     def update_user(session: Session, user_id: int, **kwargs):
         """Update user information."""
-        user = session.query(User).filter(User.id == user_id).first()
+        values = {key: value for key, value in kwargs.items() if key in User.__table__.c}
+        if not values:
+            return session.get(User, user_id)
+
+        # Single UPDATE ... RETURNING instead of SELECT, mutate, commit, refresh.
+        user = session.execute(
+            update(User).where(User.id == user_id).values(**values).returning(User)
+        ).scalars().first()
         if user:
-            for key, value in kwargs.items():
-                if hasattr(user, key):
-                    setattr(user, key, value)
             session.commit()
-            session.refresh(user)
+
+            cache = _user_cache.get()
+            if cache is not None:
+                cache.clear()
         return user
 
     @staticmethod
     def is_admin(session: Session, telegram_id: int):
         """Check if user is admin."""
+        cache = _user_cache.get()
+        if cache is not None and ('is_admin', telegram_id) in cache:
+            return cache[('is_admin', telegram_id)]
+
         user = session.query(User).filter(User.telegram_id == telegram_id).first()
-        return user and user.role in [UserRole.ADMIN, UserRole.MODERATOR]
+        result = user and user.role in [UserRole.ADMIN, UserRole.MODERATOR]
+
+        if cache is not None:
+            cache[('is_admin', telegram_id)] = result
+        return result
+
+
+# Category CRUD operations.
+class CategoryCRUD:
+    @staticmethod
+    @category_cache.cache_on_arguments()
+    def get_all_categories():
+        """Get active categories as plain dicts (cached, see invalidate_cache)."""
+        with db.get_session() as session:
+            categories = session.query(Category).filter(
+                Category.is_active == True
+            ).order_by(Category.name).all()
+            return [
+                {'id': c.id, 'name': c.name, 'description': c.description}
+                for c in categories
+            ]
+
+    @staticmethod
+    def get_category(category_id: int):
+        """Get active category by id from the cache."""
+        for category in CategoryCRUD.get_all_categories():
+            if category['id'] == category_id:
+                return category
+        return None
+
+    @staticmethod
+    def create_category(session: Session, name: str, description: Optional[str] = None):
+        """Create category and drop the cached list."""
+        category = Category(name=name, description=description)
+        session.add(category)
+        session.commit()
+        CategoryCRUD.invalidate_cache()
+        return category
+
+    @staticmethod
+    def update_category(session: Session, category_id: int, **kwargs):
+        """Update category (name, description, is_active) and drop the cached list."""
+        values = {key: value for key, value in kwargs.items() if key in Category.__table__.c}
+        if not values:
+            return session.get(Category, category_id)
+
+        category = session.execute(
+            update(Category).where(Category.id == category_id).values(**values).returning(Category)
+        ).scalars().first()
+        if category:
+            session.commit()
+            CategoryCRUD.invalidate_cache()
+        return category
+
+    @staticmethod
+    def invalidate_cache():
+        """Drop cached categories; call after any category change."""
+        CategoryCRUD.get_all_categories.invalidate()
 
 
 # Ad CRUD operations.
@@ -56,13 +173,13 @@ class AdCRUD:
         """Create new ad."""
         ad = Ad(owner_id=owner_id, **kwargs)
         session.add(ad)
-        session.commit()
-        session.refresh(ad)
+        session.flush()  # Assigns ad.id without committing.
 
-        # Add to moderation queue.
+        # Add to moderation queue in the same transaction.
         moderation_entry = ModerationQueue(ad_id=ad.id)
         session.add(moderation_entry)
         session.commit()
+        ModerationCRUD.invalidate_pending_count()
 
         return ad
 
@@ -79,27 +196,31 @@ class AdCRUD:
             query = query.filter(Ad.status == status)
         return query.order_by(desc(Ad.created_at)).all()
 
+    @staticmethod
+    def count_user_ads(session: Session, user_id: int):
+        """Count all ads of a user without loading them."""
+        return session.scalar(
+            select(func.count()).select_from(Ad).where(Ad.owner_id == user_id)
+        )
+
     @staticmethod
     def update_ad(session: Session, ad_id: int, user_id: int, **kwargs):
         """Update ad (only owner can update)."""
-        ad = session.query(Ad).filter(
-            Ad.id == ad_id,
-            Ad.owner_id == user_id
-        ).first()
-
-        if not ad:
-            return None
+        values = {key: value for key, value in kwargs.items() if key in Ad.__table__.c}
 
         # If changing content, need re-moderation.
         if any(key in kwargs for key in ['title', 'description', 'price', 'location', 'contact_info']):
-            ad.status = AdStatus.PENDING
+            values['status'] = AdStatus.PENDING
 
-        for key, value in kwargs.items():
-            if hasattr(ad, key):
-                setattr(ad, key, value)
+        if not values:
+            return session.query(Ad).filter(Ad.id == ad_id, Ad.owner_id == user_id).first()
 
-        session.commit()
-        session.refresh(ad)
+        ad = session.execute(
+            update(Ad).where(Ad.id == ad_id, Ad.owner_id == user_id).values(**values).returning(Ad)
+        ).scalars().first()
+
+        if ad:
+            session.commit()
         return ad
 
     @staticmethod
@@ -113,31 +234,35 @@ class AdCRUD:
         if ad:
             session.delete(ad)
             session.commit()
+            ModerationCRUD.invalidate_pending_count()
             return True
         return False
 
     @staticmethod
-    def search_ads(
+    def _filter_ads(
             session: Session,
             keywords: Optional[str] = None,
             location: Optional[str] = None,
             min_price: Optional[float] = None,
             max_price: Optional[float] = None,
-            category_id: Optional[int] = None,
-            limit: int = 50,
-            offset: int = 0
+            category_id: Optional[int] = None
     ):
-        """Search ads with filters."""
+        """Approved ads matching the search filters; also returns the tsquery, if any."""
         query = session.query(Ad).filter(Ad.status == AdStatus.APPROVED)
-
-        if keywords:
-            search_pattern = f"%{keywords}%"
-            query = query.filter(
-                or_(
-                    Ad.title.ilike(search_pattern),
-                    Ad.description.ilike(search_pattern)
-                )
-            )
+        ts_query = None
+
+        if keywords and session.get_bind().dialect.name == 'postgresql':
+            # Accepts multi-word, "phrase", OR and -word input without raising on bad syntax.
+            ts_query = func.websearch_to_tsquery('russian', keywords)
+            query = query.filter(AD_SEARCH_TSV.op('@@')(ts_query))
+        elif keywords:
+            # search_tsv comes from migration 0002 and only exists on Postgres;
+            # elsewhere (a create_all database, SQLite in tests) match substrings.
+            pattern = _like_contains(literal(keywords))
+            query = query.filter(or_(
+                Ad.title.ilike(pattern, escape='\\'),
+                Ad.description.ilike(pattern, escape='\\')
+            ))
 
         if location:
             query = query.filter(Ad.location.ilike(f"%{location}%"))
@@ -151,7 +276,61 @@ class AdCRUD:
         if category_id:
             query = query.filter(Ad.category_id == category_id)
 
-        return query.order_by(desc(Ad.created_at)).limit(limit).offset(offset).all()
+        return query, ts_query
+
+    @staticmethod
+    def search_ads(
+            session: Session,
+            keywords: Optional[str] = None,
+            location: Optional[str] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            category_id: Optional[int] = None,
+            limit: int = 50,
+            offset: int = 0
+    ):
+        """Search ads with filters; keyword results are ordered by rank."""
+        query, ts_query = AdCRUD._filter_ads(
+            session, keywords, location, min_price, max_price, category_id
+        )
+
+        if ts_query is not None:
+            return query.order_by(
+                desc(func.ts_rank(AD_SEARCH_TSV, ts_query)),
+                desc(Ad.created_at)
+            ).limit(limit).offset(offset).all()
+
+        return query.order_by(desc(Ad.created_at), desc(Ad.id)).limit(limit).offset(offset).all()
+
+    @staticmethod
+    def browse_ads(
+            session: Session,
+            location: Optional[str] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            category_id: Optional[int] = None,
+            limit: int = 20,
+            cursor: Optional[Tuple[datetime, int]] = None
+    ) -> Tuple[List[Ad], Optional[Tuple[datetime, int]]]:
+        """Newest-first page of ads without keywords, paged by keyset.
+
+        Returns (rows, next_cursor); pass next_cursor back to get the following page,
+        it is None on the last page. The cursor is (created_at, id) so ads created in
+        the same transaction (same now()) are neither skipped nor repeated.
+        """
+        query, _ = AdCRUD._filter_ads(
+            session, None, location, min_price, max_price, category_id
+        )
+
+        if cursor is not None:
+            query = query.filter(tuple_(Ad.created_at, Ad.id) < tuple_(*cursor))
+
+        # One extra row tells whether a next page exists.
+        rows = query.order_by(desc(Ad.created_at), desc(Ad.id)).limit(limit + 1).all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1].created_at, rows[-1].id)
 
     @staticmethod
     def moderate_ad(
@@ -162,24 +341,20 @@ class AdCRUD:
             rejection_reason: Optional[str] = None
     ):
         """Moderate ad."""
-        ad = session.query(Ad).filter(Ad.id == ad_id).first()
+        values = {'status': status, 'moderator_id': moderator_id, 'moderated_at': func.now()}
+        if status == AdStatus.REJECTED:
+            values['rejection_reason'] = rejection_reason
+
+        ad = session.execute(
+            update(Ad).where(Ad.id == ad_id).values(**values).returning(Ad)
+        ).scalars().first()
         if not ad:
             return None
 
-        ad.status = status
-        ad.moderator_id = moderator_id
-        ad.moderated_at = func.now()
-
-        if status == AdStatus.REJECTED:
-            ad.rejection_reason = rejection_reason
-
         # Remove from moderation queue.
         session.query(ModerationQueue).filter(ModerationQueue.ad_id == ad_id).delete()
 
-        session.commit()
-        session.refresh(ad)
-
-        # Create notification for owner.
+        # Create notification for owner (committed together with the status change).
         if status in [AdStatus.APPROVED, AdStatus.REJECTED]:
             NotificationCRUD.create_notification(
                 session,
@@ -187,9 +362,13 @@ class AdCRUD:
                 type=f"ad_{status.value}",
                 title="Статус объявления изменен",
                 content=f"Ваше объявление '{ad.title}' было {'одобрено' if status == AdStatus.APPROVED else 'отклонено'}",
-                data={"ad_id": ad.id, "status": status.value}
+                data={"ad_id": ad.id, "status": status.value},
+                commit=False
             )
 
+        session.commit()
+        ModerationCRUD.invalidate_pending_count()
+
         return ad
 
 
@@ -211,10 +390,9 @@ class MessageCRUD:
             ad_id=ad_id
         )
         session.add(message)
-        session.commit()
-        session.refresh(message)
+        session.flush()  # Assigns message.id for the notification payload.
 
-        # Create notification for receiver.
+        # Create notification for receiver in the same transaction.
         NotificationCRUD.create_notification(
             session,
             user_id=receiver_id,
@@ -225,11 +403,23 @@ class MessageCRUD:
                 "message_id": message.id,
                 "sender_id": sender_id,
                 "ad_id": ad_id
-            }
+            },
+            commit=False
         )
 
+        session.commit()
+
         return message
 
+    @staticmethod
+    def _conversation_query(session: Session, user1_id: int, user2_id: int):
+        return session.query(Message).filter(
+            or_(
+                and_(Message.sender_id == user1_id, Message.receiver_id == user2_id),
+                and_(Message.sender_id == user2_id, Message.receiver_id == user1_id)
+            )
+        )
+
     @staticmethod
     def get_conversation(
             session: Session,
@@ -239,20 +429,46 @@ class MessageCRUD:
             offset: int = 0
     ):
         """Get conversation between two users."""
-        return session.query(Message).filter(
-            or_(
-                and_(Message.sender_id == user1_id, Message.receiver_id == user2_id),
-                and_(Message.sender_id == user2_id, Message.receiver_id == user1_id)
-            )
-        ).order_by(Message.created_at).limit(limit).offset(offset).all()
+        return MessageCRUD._conversation_query(session, user1_id, user2_id).order_by(
+            Message.created_at, Message.id
+        ).limit(limit).offset(offset).all()
+
+    @staticmethod
+    def get_conversation_page(
+            session: Session,
+            user1_id: int,
+            user2_id: int,
+            limit: int = 50,
+            cursor: Optional[Tuple[datetime, int]] = None
+    ) -> Tuple[List[Message], Optional[Tuple[datetime, int]]]:
+        """Get conversation between two users, oldest first, paged by keyset.
+
+        Returns (rows, next_cursor); pass next_cursor back to get the following page,
+        it is None on the last page. The cursor is (created_at, id) so messages with
+        the same created_at are neither skipped nor repeated.
+        """
+        query = MessageCRUD._conversation_query(session, user1_id, user2_id)
+
+        if cursor is not None:
+            query = query.filter(tuple_(Message.created_at, Message.id) > tuple_(*cursor))
+
+        # One extra row tells whether a next page exists.
+        rows = query.order_by(Message.created_at, Message.id).limit(limit + 1).all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1].created_at, rows[-1].id)
 
     @staticmethod
     def get_unread_count(session: Session, user_id: int):
         """Get count of unread messages for user."""
-        return session.query(Message).filter(
-            Message.receiver_id == user_id,
-            Message.is_read == False
-        ).count()
+        # Flat SELECT count(*) ... WHERE, answered from messages_unread_by_receiver.
+        return session.scalar(
+            select(func.count()).select_from(Message).where(
+                Message.receiver_id == user_id,
+                Message.is_read == False
+            )
+        )
 
 
 # Feedback CRUD operations.
@@ -278,10 +494,77 @@ class FeedbackCRUD:
             type=feedback_type
         )
         session.add(feedback)
+        session.flush()
+
+        # Keep the stored aggregate on the ad in step, in the same transaction.
+        if ad_id is not None and feedback_type == "ad":
+            FeedbackCRUD._refresh_ad_rating(session, ad_id)
+
         session.commit()
-        session.refresh(feedback)
         return feedback
 
+    @staticmethod
+    def update_feedback(session: Session, feedback_id: int, user_id: int, **kwargs):
+        """Update own feedback (rating, comment)."""
+        values = {key: value for key, value in kwargs.items() if key in ('rating', 'comment')}
+        if 'rating' in values and not 1 <= values['rating'] <= 5:
+            raise ValueError("Rating must be between 1 and 5")
+        if not values:
+            return session.query(Feedback).filter(
+                Feedback.id == feedback_id, Feedback.user_id == user_id
+            ).first()
+
+        feedback = session.execute(
+            update(Feedback)
+            .where(Feedback.id == feedback_id, Feedback.user_id == user_id)
+            .values(**values)
+            .returning(Feedback)
+        ).scalars().first()
+
+        if feedback:
+            if feedback.ad_id is not None and feedback.type == "ad":
+                FeedbackCRUD._refresh_ad_rating(session, feedback.ad_id)
+            session.commit()
+        return feedback
+
+    @staticmethod
+    def delete_feedback(session: Session, feedback_id: int, user_id: int):
+        """Delete own feedback."""
+        deleted = session.execute(
+            delete(Feedback)
+            .where(Feedback.id == feedback_id, Feedback.user_id == user_id)
+            .returning(Feedback.ad_id, Feedback.type)
+        ).first()
+
+        if not deleted:
+            return False
+
+        if deleted.ad_id is not None and deleted.type == "ad":
+            FeedbackCRUD._refresh_ad_rating(session, deleted.ad_id)
+        session.commit()
+        return True
+
+    @staticmethod
+    def _refresh_ad_rating(session: Session, ad_id: int):
+        """Recompute the stored aggregate on the ad from its feedback rows.
+
+        Recomputing instead of adjusting in place keeps the aggregate correct
+        whatever changed the rows; it reads only this ad's feedback through
+        ix_feedbacks_ad_type.
+        """
+        ad_feedback = and_(Feedback.ad_id == ad_id, Feedback.type == "ad")
+        session.execute(
+            update(Ad)
+            .where(Ad.id == ad_id)
+            .values(
+                avg_rating=func.coalesce(
+                    select(func.avg(Feedback.rating)).where(ad_feedback).scalar_subquery(), 0
+                ),
+                rating_count=select(func.count()).select_from(Feedback).where(ad_feedback).scalar_subquery()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
     @staticmethod
     def get_ad_feedback(session: Session, ad_id: int):
         """Get all feedback for an ad."""
@@ -291,24 +574,26 @@ class FeedbackCRUD:
         ).order_by(desc(Feedback.created_at)).all()
 
     @staticmethod
-    def get_bot_feedback(session: Session, limit: int = 100):
-        """Get all feedback for the bot."""
-        return session.query(Feedback).filter(
+    def get_bot_feedback(session: Session, limit: Optional[int] = 100):
+        """Stream up to `limit` bot feedback rows (None means all).
+
+        This is a generator, not a list: consume it while the session is still open.
+        """
+        query = session.query(Feedback).filter(
             Feedback.type == "bot"
-        ).order_by(desc(Feedback.created_at)).limit(limit).all()
+        ).order_by(desc(Feedback.created_at)).limit(limit)
+
+        # Server-side cursor: rows arrive in batches instead of one big list.
+        yield from query.execution_options(stream_results=True).yield_per(500)
 
     @staticmethod
     def get_average_rating(session: Session, ad_id: int):
-        """Get average rating for an ad."""
-        result = session.query(
-            func.avg(Feedback.rating).label('average'),
-            func.count(Feedback.id).label('count')
-        ).filter(
-            Feedback.ad_id == ad_id,
-            Feedback.type == "ad"
-        ).first()
+        """Get average rating for an ad (stored aggregate, see _refresh_ad_rating)."""
+        result = session.query(Ad.avg_rating, Ad.rating_count).filter(Ad.id == ad_id).first()
 
-        return result.average, result.count
+        if not result or not result.rating_count:
+            return None, 0
+        return result.avg_rating, result.rating_count
 
 
 # Search Query CRUD operations.
@@ -334,7 +619,6 @@ class SearchQueryCRUD:
         )
         session.add(query)
         session.commit()
-        session.refresh(query)
         return query
 
     @staticmethod
@@ -346,41 +630,58 @@ class SearchQueryCRUD:
         ).all()
 
     @staticmethod
-    def get_queries_for_notification(session: Session, ad: Ad):
-        """Get all search queries that match an ad."""
-        queries = session.query(SearchQuery).filter(
-            SearchQuery.is_active == True,
-            SearchQuery.last_notified < ad.created_at  # Only notify once per ad
-        )
-
-        matching_queries = []
-        for query in queries:
-            matches = True
+    def get_queries_for_notification(session: Session, ad):
+        """Claim and return the search queries that match an ad and were not notified about it yet.
 
-            if query.keywords:
-                matches = matches and (
-                        query.keywords.lower() in ad.title.lower() or
-                        query.keywords.lower() in ad.description.lower()
-                )
+        ad may be an Ad or any row with its id, title, description, price, location,
+        category_id and created_at.
 
-            if query.location:
-                matches = matches and (
-                        query.location.lower() in ad.location.lower()
-                )
+        The claim rows are written in the caller's transaction; commit it before
+        sending, and delete the claims of sends that failed so the next run retries them.
+        """
+        keywords = _like_contains(SearchQuery.keywords)
+        location = _like_contains(SearchQuery.location)
 
-            if query.min_price:
-                matches = matches and (ad.price >= query.min_price)
-
-            if query.max_price:
-                matches = matches and (ad.price <= query.max_price)
+        matches = select(SearchQuery.id, literal(ad.id)).where(
+            SearchQuery.is_active == True,
+            # Only ads newer than the last notification (or than the query itself).
+            func.coalesce(SearchQuery.last_notified, SearchQuery.created_at) < ad.created_at,
+            or_(
+                SearchQuery.keywords.is_(None),
+                literal(ad.title).ilike(keywords, escape='\\'),
+                literal(ad.description).ilike(keywords, escape='\\')
+            ),
+            or_(
+                SearchQuery.location.is_(None),
+                literal(ad.location).ilike(location, escape='\\')
+            ),
+            or_(SearchQuery.min_price.is_(None), SearchQuery.min_price <= ad.price),
+            or_(SearchQuery.max_price.is_(None), SearchQuery.max_price >= ad.price),
+            or_(SearchQuery.category_id.is_(None), SearchQuery.category_id == ad.category_id)
+        )
 
-            if query.category_id:
-                matches = matches and (ad.category_id == query.category_id)
+        # INSERT ... ON CONFLICT DO NOTHING RETURNING only yields queries that were not
+        # claimed before, so concurrent runs can never notify the same (query, ad) twice.
+        claimed = pg_insert(NotifiedAd).from_select(
+            ['query_id', 'ad_id'], matches
+        ).on_conflict_do_nothing().returning(NotifiedAd.query_id).cte('claimed')
 
-            if matches:
-                matching_queries.append(query)
+        # Callers message query.user for every match; many-to-one, so join it in.
+        return session.query(SearchQuery).options(
+            joinedload(SearchQuery.user)
+        ).join(claimed, claimed.c.query_id == SearchQuery.id).all()
 
-        return matching_queries
+    @staticmethod
+    def mark_notified(session: Session, query_ids: List[int]):
+        """Stamp last_notified for many queries in one UPDATE (committed by the caller)."""
+        if not query_ids:
+            return
+        session.execute(
+            update(SearchQuery)
+            .where(SearchQuery.id.in_(query_ids))
+            .values(last_notified=func.now())
+            .execution_options(synchronize_session=False)
+        )
 
 
 # Notification CRUD operations.
@@ -392,9 +693,10 @@ class NotificationCRUD:
             type: str,
             content: str,
             title: Optional[str] = None,
-            data: Optional[Dict] = None
+            data: Optional[Dict] = None,
+            commit: bool = True
     ):
-        """Create notification for user."""
+        """Create notification for user (commit=False leaves it to the caller's transaction)."""
         notification = Notification(
             user_id=user_id,
             type=type,
@@ -403,10 +705,18 @@ class NotificationCRUD:
             data=data or {}
         )
         session.add(notification)
-        session.commit()
-        session.refresh(notification)
+        if commit:
+            session.commit()
         return notification
 
+    @staticmethod
+    def bulk_create(session: Session, rows: List[Dict[str, Any]]):
+        """Create many notifications with a single multi-row INSERT."""
+        if not rows:
+            return
+        session.execute(insert(Notification), rows)
+        session.commit()
+
     @staticmethod
     def get_unread_notifications(session: Session, user_id: int, limit: int = 50):
         """Get unread notifications for user."""
@@ -443,13 +753,24 @@ class NotificationCRUD:
 class ModerationCRUD:
     @staticmethod
     def get_pending_ads_count(session: Session):
-        """Get count of ads pending moderation."""
-        return session.query(ModerationQueue).count()
+        """Get count of ads pending moderation (cached for a few seconds)."""
+        return moderation_cache.get_or_create(
+            'pending_count',
+            lambda: session.scalar(select(func.count()).select_from(ModerationQueue))
+        )
+
+    @staticmethod
+    def invalidate_pending_count():
+        """Drop the cached pending count; call after enqueueing or dequeueing an ad."""
+        moderation_cache.delete('pending_count')
 
     @staticmethod
     def get_next_ad_to_moderate(session: Session):
         """Get next ad to moderate (highest priority first)."""
-        return session.query(ModerationQueue).join(Ad).order_by(
+        # The moderation screen renders entry.ad and entry.ad.owner right away.
+        return session.query(ModerationQueue).options(
+            selectinload(ModerationQueue.ad).selectinload(Ad.owner)
+        ).join(Ad).order_by(
             desc(ModerationQueue.priority),
             ModerationQueue.created_at
         ).first()
@@ -457,19 +778,19 @@ class ModerationCRUD:
     @staticmethod
     def assign_ad_to_moderator(session: Session, ad_id: int, moderator_id: int):
         """Assign ad to moderator."""
-        queue_entry = session.query(ModerationQueue).filter(
-            ModerationQueue.ad_id == ad_id
-        ).first()
-
-        if queue_entry:
-            queue_entry.assigned_to = moderator_id
-            session.commit()
-            return True
-        return False
+        result = session.execute(
+            update(ModerationQueue)
+            .where(ModerationQueue.ad_id == ad_id)
+            .values(assigned_to=moderator_id)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return result.rowcount > 0
 
 
 # Initialize CRUD classes.
 user_crud = UserCRUD()
+category_crud = CategoryCRUD()
 ad_crud = AdCRUD()
 message_crud = MessageCRUD()
 feedback_crud = FeedbackCRUD()
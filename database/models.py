@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Integer, String, Float, Text, Boolean,
-    DateTime, ForeignKey, Table, Enum, JSON
+    DateTime, ForeignKey, Table, Enum, JSON, Index, text
 )
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.sql import func
@@ -39,7 +39,7 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships.
-    ads = relationship("Ad", back_populates="owner", cascade="all, delete-orphan")
+    ads = relationship("Ad", back_populates="owner", foreign_keys="Ad.owner_id", cascade="all, delete-orphan")
     feedbacks = relationship("Feedback", back_populates="user", cascade="all, delete-orphan")
     search_queries = relationship("SearchQuery", back_populates="user", cascade="all, delete-orphan")
     notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan")
@@ -59,6 +59,13 @@ class Category(Base):
 
 class Ad(Base):
     __tablename__ = "ads"
+    __table_args__ = (
+        # search_ads / cleanup: status filter ordered by created_at.
+        Index("ix_ads_status_created", "status", "created_at"),
+        Index("ix_ads_category", "category_id"),
+        # cleanup_old_data: archive approved ads by updated_at.
+        Index("ix_ads_status_updated", "status", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String(200), nullable=False)
@@ -69,6 +76,10 @@ class Ad(Base):
     status = Column(Enum(AdStatus), default=AdStatus.PENDING)
     rejection_reason = Column(Text)
 
+    # Aggregated feedback, maintained by FeedbackCRUD.create_feedback.
+    avg_rating = Column(Float, nullable=False, default=0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Foreign keys.
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"))
@@ -89,6 +100,16 @@ class Ad(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Partial index: unread counters only touch unread rows.
+        Index(
+            "messages_unread_by_receiver", "receiver_id",
+            postgresql_where=text("is_read = false")
+        ),
+        # Both directions of a conversation, already in created_at order.
+        Index("messages_s_r_created", "sender_id", "receiver_id", "created_at"),
+        Index("messages_r_s_created", "receiver_id", "sender_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     content = Column(Text, nullable=False)
@@ -110,6 +131,9 @@ class Message(Base):
 
 class Feedback(Base):
     __tablename__ = "feedbacks"
+    __table_args__ = (
+        Index("ix_feedbacks_ad_type", "ad_id", "type"),
+    )
 
     id = Column(Integer, primary_key=True)
     rating = Column(Integer, nullable=False)  # 1-5.
@@ -130,6 +154,10 @@ class Feedback(Base):
 
 class SearchQuery(Base):
     __tablename__ = "search_queries"
+    __table_args__ = (
+        # cleanup_old_data: drop queries that have not fired for a long time.
+        Index("ix_search_queries_last_notified", "last_notified"),
+    )
 
     id = Column(Integer, primary_key=True)
     keywords = Column(String(200))
@@ -151,8 +179,32 @@ class SearchQuery(Base):
     category = relationship("Category")
 
 
+class NotifiedAd(Base):
+    __tablename__ = "notified_ads"
+    __table_args__ = (
+        # Backs the ON DELETE CASCADE from ads.
+        Index("ix_notified_ads_ad", "ad_id"),
+    )
+
+    # The composite primary key is the dedup guard: one row per (search query, ad).
+    query_id = Column(Integer, ForeignKey("search_queries.id", ondelete="CASCADE"), primary_key=True)
+    ad_id = Column(Integer, ForeignKey("ads.id", ondelete="CASCADE"), primary_key=True)
+
+    # Timestamps.
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # get_unread_notifications: newest unread per user.
+        Index(
+            "ix_notifications_user_unread", "user_id", "created_at",
+            postgresql_where=text("is_read = false")
+        ),
+        # cleanup_old_data: purge read notifications by age.
+        Index("ix_notifications_isread_created", "is_read", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     type = Column(String(50), nullable=False)  # 'new_ad', 'new_message', 'ad_approved', etc.
@@ -173,6 +225,10 @@ class Notification(Base):
 
 class ModerationQueue(Base):
     __tablename__ = "moderation_queue"
+    __table_args__ = (
+        # get_next_ad_to_moderate: ORDER BY priority DESC, created_at.
+        Index("ix_moderation_queue_prio_created", text("priority DESC"), "created_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     ad_id = Column(Integer, ForeignKey("ads.id"), unique=True, nullable=False)
@@ -185,3 +241,4 @@ class ModerationQueue(Base):
     # Relationships.
     ad = relationship("Ad")
     moderator = relationship("User", foreign_keys=[assigned_to])
+
@@ -5,8 +5,10 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from telegram.ext import Application, ApplicationBuilder, Defaults, ContextTypes
+from telegram import Update
+from telegram.ext import Application, ApplicationBuilder, Defaults, ContextTypes, TypeHandler, AIORateLimiter
 from telegram.constants import ParseMode
+from sqlalchemy import text
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,6 +23,7 @@ from bot.handlers.notifications import register_handlers as register_notificatio
 from scheduler.jobs import setup_scheduler
 
 from database.connection import db
+from database.crud import user_crud, ad_crud, message_crud, notification_crud, moderation_crud
 from config import settings
 
 logging.basicConfig(
@@ -35,18 +38,55 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _warm_sync_queries(session):
+    # Запросы синхронных обработчиков (db.get_session()).
+    user_crud.is_admin(session, -1)
+    user_crud.get_by_id(session, -1)
+    ad_crud.get_ad(session, -1)
+    message_crud.get_unread_count(session, -1)
+    notification_crud.get_unread_notifications(session, -1)
+    moderation_crud.get_pending_ads_count(session)
+
+
+def _warm_async_queries(session):
+    # Запросы, которые идут через асинхронный движок: /start, поиск, планировщик.
+    # У него свой кэш компиляции. is_admin дает тот же SQL, что поиск в get_or_create.
+    user_crud.is_admin(session, -1)
+    ad_crud.search_ads(session, keywords="x")
+    ad_crud.search_ads(session)
+    moderation_crud.get_pending_ads_count(session)
+
+
+async def warm_statement_cache():
+    # Прогоняю типовые запросы, чтобы их SQL попал в кэш компиляции каждого движка; транзакции откатываются.
+    # Прогрев необязателен: ошибка (например, не применена миграция с search_tsv) не мешает запуску.
+    try:
+        with db.get_session() as session:
+            _warm_sync_queries(session)
+            session.rollback()
+
+        async with db.get_async_session() as session:
+            await session.run_sync(_warm_async_queries)
+            await session.rollback()
+    except Exception as e:
+        logger.warning(f"Statement cache warm-up skipped: {e}")
+
+
 async def post_init(application: Application):
     logger.info("Bot initialization completed")
 
     # Проверяю подключение к базе данных (без создания таблиц).
     try:
         with db.get_session() as session:
-            session.execute("SELECT 1")
+            session.execute(text("SELECT 1"))
         logger.info("Database connection successful")
+        db.warm_pool()
     except Exception as e:
         logger.error(f"Failed to connect to database: {e}")
         raise
 
+    await warm_statement_cache()
+
     try:
         setup_scheduler(application.bot)
         logger.info("Scheduler setup completed")
@@ -62,6 +102,13 @@ async def post_shutdown(application: Application):
         scheduler.stop()
 
     db.dispose_engine()
+    await db.dispose_async_engine()
+
+
+async def reset_request_cache(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # Новый кэш пользователей на каждый апдейт; выполняется блокирующе в группе -1,
+    # чтобы задачи обработчиков следующих групп унаследовали его контекст.
+    user_crud.reset_cache()
 
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE):
@@ -113,10 +160,13 @@ async def main():
         .post_init(post_init)
         .post_shutdown(post_shutdown)
         .concurrent_updates(True)
+        # Global 30 msg/s pacing and automatic retry on 429 (RetryAfter) for every send.
+        .rate_limiter(AIORateLimiter(max_retries=3))
         .build()
     )
 
     application.add_error_handler(error_handler)
+    application.add_handler(TypeHandler(Update, reset_request_cache, block=True), group=-1)
 
     logger.info("Registering handlers...")
     register_start_handlers(application)
@@ -21,12 +21,31 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# Created by raw SQL in 0001/0002 and not declared on the models; keep
+# autogenerate from proposing to drop them.
+UNMANAGED_INDEXES = {
+    "ads_title_trgm",
+    "ads_description_trgm",
+    "ads_location_trgm",
+    "ads_search_tsv",
+}
+UNMANAGED_COLUMNS = {("ads", "search_tsv")}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "index" and name in UNMANAGED_INDEXES:
+        return False
+    if type_ == "column" and (object.table.name, name) in UNMANAGED_COLUMNS:
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -44,7 +63,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
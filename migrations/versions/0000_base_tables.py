@@ -0,0 +1,162 @@
+"""base tables
+
+Revision ID: 0000_base_tables
+Revises:
+Create Date: 2026-10-16 09:30:00.000000
+
+Tables as they were before the first migration. A database created with
+Base.metadata.create_all() already matches head: stamp it with
+`alembic stamp head` instead of upgrading.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0000_base_tables'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('telegram_id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=100), nullable=True),
+        sa.Column('first_name', sa.String(length=100), nullable=True),
+        sa.Column('last_name', sa.String(length=100), nullable=True),
+        sa.Column('phone_number', sa.String(length=20), nullable=True),
+        sa.Column('role', sa.Enum('USER', 'MODERATOR', 'ADMIN', name='userrole'), nullable=True),
+        sa.Column('is_banned', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_telegram_id', 'users', ['telegram_id'], unique=True)
+
+    op.create_table(
+        'categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+
+    op.create_table(
+        'ads',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('location', sa.String(length=200), nullable=False),
+        sa.Column('contact_info', sa.Text(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('DRAFT', 'PENDING', 'APPROVED', 'REJECTED', 'RENTED', 'ARCHIVED', name='adstatus'),
+            nullable=True
+        ),
+        sa.Column('rejection_reason', sa.Text(), nullable=True),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('moderator_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('moderated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.ForeignKeyConstraint(['moderator_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'messages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('is_read', sa.Boolean(), nullable=True),
+        sa.Column('sender_id', sa.Integer(), nullable=False),
+        sa.Column('receiver_id', sa.Integer(), nullable=False),
+        sa.Column('ad_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['receiver_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['ad_id'], ['ads.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'feedbacks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('rating', sa.Integer(), nullable=False),
+        sa.Column('comment', sa.Text(), nullable=True),
+        sa.Column('type', sa.String(length=50), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('ad_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['ad_id'], ['ads.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'search_queries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('keywords', sa.String(length=200), nullable=True),
+        sa.Column('location', sa.String(length=200), nullable=True),
+        sa.Column('min_price', sa.Float(), nullable=True),
+        sa.Column('max_price', sa.Float(), nullable=True),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('last_notified', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=True),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.Column('is_read', sa.Boolean(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'moderation_queue',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ad_id', sa.Integer(), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=True),
+        sa.Column('assigned_to', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['ad_id'], ['ads.id']),
+        sa.ForeignKeyConstraint(['assigned_to'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('ad_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('moderation_queue')
+    op.drop_table('notifications')
+    op.drop_table('search_queries')
+    op.drop_table('feedbacks')
+    op.drop_table('messages')
+    op.drop_table('ads')
+    op.drop_table('categories')
+    op.drop_index('ix_users_telegram_id', table_name='users')
+    op.drop_table('users')
+    sa.Enum(name='adstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='userrole').drop(op.get_bind(), checkfirst=True)
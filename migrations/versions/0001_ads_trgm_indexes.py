@@ -0,0 +1,30 @@
+"""ads trigram indexes for ILIKE search
+
+Revision ID: 0001_ads_trgm_indexes
+Revises: 0000_base_tables
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_ads_trgm_indexes'
+down_revision = '0000_base_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Lets AdCRUD.search_ads' ILIKE '%...%' filters use an index instead of a seq scan.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX IF NOT EXISTS ads_title_trgm ON ads USING gin (title gin_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS ads_description_trgm ON ads USING gin (description gin_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS ads_location_trgm ON ads USING gin (location gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ads_location_trgm")
+    op.execute("DROP INDEX IF EXISTS ads_description_trgm")
+    op.execute("DROP INDEX IF EXISTS ads_title_trgm")
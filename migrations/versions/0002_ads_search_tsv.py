@@ -0,0 +1,32 @@
+"""ads full-text search vector
+
+Revision ID: 0002_ads_search_tsv
+Revises: 0001_ads_trgm_indexes
+Create Date: 2026-10-16 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_ads_search_tsv'
+down_revision = '0001_ads_trgm_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Must stay in sync with the expression used by AdCRUD.search_ads.
+    op.execute(
+        "ALTER TABLE ads ADD COLUMN search_tsv tsvector "
+        "GENERATED ALWAYS AS ("
+        "to_tsvector('russian', coalesce(title, '') || ' ' || coalesce(description, ''))"
+        ") STORED"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ads_search_tsv ON ads USING gin (search_tsv)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ads_search_tsv")
+    op.drop_column('ads', 'search_tsv')
@@ -0,0 +1,30 @@
+"""messages partial index for unread counts
+
+Revision ID: 0003_messages_unread_index
+Revises: 0002_ads_search_tsv
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_messages_unread_index'
+down_revision = '0002_ads_search_tsv'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'messages_unread_by_receiver',
+        'messages',
+        ['receiver_id'],
+        postgresql_where=sa.text('is_read = false'),
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('messages_unread_by_receiver', table_name='messages', if_exists=True)
@@ -0,0 +1,36 @@
+"""messages composite indexes for conversations
+
+Revision ID: 0004_messages_conversation_indexes
+Revises: 0003_messages_unread_index
+Create Date: 2026-10-16 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_messages_conversation_indexes'
+down_revision = '0003_messages_unread_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'messages_s_r_created',
+        'messages',
+        ['sender_id', 'receiver_id', 'created_at'],
+        if_not_exists=True
+    )
+    op.create_index(
+        'messages_r_s_created',
+        'messages',
+        ['receiver_id', 'sender_id', 'created_at'],
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('messages_r_s_created', table_name='messages', if_exists=True)
+    op.drop_index('messages_s_r_created', table_name='messages', if_exists=True)
@@ -0,0 +1,36 @@
+"""ads stored rating aggregate
+
+Revision ID: 0005_ads_rating_aggregate
+Revises: 0004_messages_conversation_indexes
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_ads_rating_aggregate'
+down_revision = '0004_messages_conversation_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('ads', sa.Column('avg_rating', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('ads', sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from existing ad feedback.
+    op.execute(
+        "UPDATE ads SET avg_rating = agg.average, rating_count = agg.total "
+        "FROM ("
+        "SELECT ad_id, AVG(rating) AS average, COUNT(id) AS total "
+        "FROM feedbacks WHERE type = 'ad' AND ad_id IS NOT NULL GROUP BY ad_id"
+        ") AS agg "
+        "WHERE ads.id = agg.ad_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('ads', 'rating_count')
+    op.drop_column('ads', 'avg_rating')
@@ -0,0 +1,43 @@
+"""indexes for hot CRUD filter columns
+
+Revision ID: 0006_hot_filter_indexes
+Revises: 0005_ads_rating_aggregate
+Create Date: 2026-10-16 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_hot_filter_indexes'
+down_revision = '0005_ads_rating_aggregate'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_ads_status_created', 'ads', ['status', 'created_at'], if_not_exists=True)
+    op.create_index('ix_ads_category', 'ads', ['category_id'], if_not_exists=True)
+    op.create_index('ix_feedbacks_ad_type', 'feedbacks', ['ad_id', 'type'], if_not_exists=True)
+    op.create_index(
+        'ix_notifications_user_unread',
+        'notifications',
+        ['user_id', 'created_at'],
+        postgresql_where=sa.text('is_read = false'),
+        if_not_exists=True
+    )
+    op.create_index(
+        'ix_moderation_queue_prio_created',
+        'moderation_queue',
+        [sa.text('priority DESC'), 'created_at'],
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_moderation_queue_prio_created', table_name='moderation_queue', if_exists=True)
+    op.drop_index('ix_notifications_user_unread', table_name='notifications', if_exists=True)
+    op.drop_index('ix_feedbacks_ad_type', table_name='feedbacks', if_exists=True)
+    op.drop_index('ix_ads_category', table_name='ads', if_exists=True)
+    op.drop_index('ix_ads_status_created', table_name='ads', if_exists=True)
@@ -0,0 +1,34 @@
+"""notified_ads dedup table for search notifications
+
+Revision ID: 0007_notified_ads
+Revises: 0006_hot_filter_indexes
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_notified_ads'
+down_revision = '0006_hot_filter_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notified_ads',
+        sa.Column('query_id', sa.Integer(), nullable=False),
+        sa.Column('ad_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['query_id'], ['search_queries.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['ad_id'], ['ads.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('query_id', 'ad_id')
+    )
+    op.create_index('ix_notified_ads_ad', 'notified_ads', ['ad_id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notified_ads_ad', table_name='notified_ads', if_exists=True)
+    op.drop_table('notified_ads')
@@ -0,0 +1,28 @@
+"""indexes for scheduler cleanup predicates
+
+Revision ID: 0008_cleanup_job_indexes
+Revises: 0007_notified_ads
+Create Date: 2026-10-16 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_cleanup_job_indexes'
+down_revision = '0007_notified_ads'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_ads_status_updated', 'ads', ['status', 'updated_at'], if_not_exists=True)
+    op.create_index('ix_notifications_isread_created', 'notifications', ['is_read', 'created_at'], if_not_exists=True)
+    op.create_index('ix_search_queries_last_notified', 'search_queries', ['last_notified'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_search_queries_last_notified', table_name='search_queries', if_exists=True)
+    op.drop_index('ix_notifications_isread_created', table_name='notifications', if_exists=True)
+    op.drop_index('ix_ads_status_updated', table_name='ads', if_exists=True)
@@ -3,85 +3,149 @@
 """
 import logging
 import asyncio
+import heapq
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-from apscheduler.triggers.cron import CronTrigger
-
-from database.crud import (
-    ad_crud, notification_crud, search_query_crud,
-    moderation_crud, user_crud
+from typing import List, Dict, Any, Tuple, Optional, Callable, Awaitable
+from telegram.error import RetryAfter
+from sqlalchemy import select, update, delete, func, literal, tuple_
+from sqlalchemy.orm import contains_eager
+
+from database.crud import search_query_crud, moderation_crud
+from database.models import (
+    AdStatus, UserRole, User, Ad, Message, Feedback,
+    Notification, SearchQuery, ModerationQueue, NotifiedAd
 )
-from database.models import AdStatus
 from database.connection import db
 from bot.utils import formatter
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Лимит Telegram Bot API: ~30 сообщений в секунду на бота.
+SEND_CONCURRENCY = 25
+SEND_MAX_CONCURRENCY = 30
+SEND_RATE_PER_SECOND = 30
+SEND_ATTEMPTS = 3
+
+# Сколько объявлений показываем в одном дайджесте пользователю.
+DIGEST_MAX_ADS = 10
+
+# Сколько секунд держим в памяти списки модераторов и админов.
+RECIPIENTS_TTL = 600
+
+
+def _every(interval: timedelta) -> Callable[[datetime], datetime]:
+    """Интервальный запуск: через interval после предыдущего."""
+    return lambda after: after + interval
+
+
+def _hourly_every(step: int) -> Callable[[datetime], datetime]:
+    """Запуск в начале каждого step-го часа (0, step, 2*step, ...)."""
+    def next_run(after: datetime) -> datetime:
+        run = after.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        while run.hour % step:
+            run += timedelta(hours=1)
+        return run
+    return next_run
+
+
+def _daily_at(hour: int, minute: int = 0) -> Callable[[datetime], datetime]:
+    """Ежедневный запуск в hour:minute."""
+    def next_run(after: datetime) -> datetime:
+        run = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return run if run > after else run + timedelta(days=1)
+    return next_run
+
+
+class _TokenBucket:
+    """Token bucket: не больше rate отправок в секунду."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _AdmissionController:
+    """Счетчик параллельных отправок с изменяемым пределом (уменьшается при 429)."""
+
+    def __init__(self, limit: int, max_limit: int):
+        self.limit = limit
+        self.max_limit = max_limit
+        self.active = 0
+        self._cond = asyncio.Condition(asyncio.Lock())
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self):
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify(1)
+
+    async def shrink(self):
+        # Новые отправки просто не пройдут wait_for, будить никого не нужно.
+        async with self._cond:
+            self.limit = max(1, self.limit // 2)
+
+    async def grow(self):
+        async with self._cond:
+            if self.limit < self.max_limit:
+                self.limit += 1
+                self._cond.notify_all()
+
 
 class JobScheduler:
     """Менеджер планировщика задач."""
 
     def __init__(self, bot):
+        # Тот же Bot, что у Application: общий HTTP-пул с keep-alive и общий AIORateLimiter.
         self.bot = bot
-        self.scheduler = AsyncIOScheduler()
-        self.jobs = {}
+        self.jobs: Dict[str, Tuple[str, Callable[[], Awaitable[Any]], Callable[[datetime], datetime]]] = {}
+        self._supervisor_task: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+        self._admission = _AdmissionController(SEND_CONCURRENCY, SEND_MAX_CONCURRENCY)
+        self._bucket = _TokenBucket(SEND_RATE_PER_SECOND)
+        self._recipients: Dict[str, Tuple[float, List[Any]]] = {}
 
     def start(self):
         """Запуск планировщика."""
         try:
-            # Уведомления о новых объявлениях.
-            self.scheduler.add_job(
-                self.notify_new_ads,
-                trigger=IntervalTrigger(
-                    minutes=settings.NOTIFICATION_CHECK_INTERVAL
+            self.jobs = {
+                # Уведомления о новых объявлениях.
+                'notify_new_ads': (
+                    'Уведомления о новых объявлениях',
+                    self.notify_new_ads,
+                    _every(timedelta(minutes=settings.NOTIFICATION_CHECK_INTERVAL))
                 ),
-                id='notify_new_ads',
-                name='Уведомления о новых объявлениях',
-                replace_existing=True
-            )
-
-            # Оповещение модераторов.
-            self.scheduler.add_job(
-                self.notify_moderators,
-                trigger=CronTrigger(hour='*/6'),  # Каждые 6 часов.
-                id='notify_moderators',
-                name='Оповещение модераторов',
-                replace_existing=True
-            )
-
-            # Очистка старых данных.
-            self.scheduler.add_job(
-                self.cleanup_old_data,
-                trigger=CronTrigger(hour=3),  # В 3 ночи
-                id='cleanup_old_data',
-                name='Очистка старых данных',
-                replace_existing=True
-            )
-
-            # Статистика.
-            self.scheduler.add_job(
-                self.send_daily_stats,
-                trigger=CronTrigger(hour=9, minute=0),  # В 9 утра
-                id='daily_stats',
-                name='Ежедневная статистика',
-                replace_existing=True
-            )
-
-            # Проверка здоровья.
-            self.scheduler.add_job(
-                self.health_check,
-                trigger=IntervalTrigger(minutes=5),
-                id='health_check',
-                name='Проверка здоровья',
-                replace_existing=True
-            )
+                # Оповещение модераторов, каждые 6 часов.
+                'notify_moderators': ('Оповещение модераторов', self.notify_moderators, _hourly_every(6)),
+                # Очистка старых данных, в 3 ночи.
+                'cleanup_old_data': ('Очистка старых данных', self.cleanup_old_data, _daily_at(3)),
+                # Статистика, в 9 утра.
+                'daily_stats': ('Ежедневная статистика', self.send_daily_stats, _daily_at(9)),
+                # Проверка здоровья.
+                'health_check': ('Проверка здоровья', self.health_check, _every(timedelta(minutes=5))),
+            }
 
-            # Старт планировщика.
-            self.scheduler.start()
-            logger.info(f"Планировщик запущен с {len(self.scheduler.get_jobs())} задачами")
+            # Один супервизор в общем event loop вместо APScheduler.
+            self._supervisor_task = asyncio.create_task(self._supervisor())
+            logger.info(f"Планировщик запущен с {len(self.jobs)} задачами")
 
             # Запускаем все задачи немедленно для инициализации.
             asyncio.create_task(self.run_initial_jobs())
@@ -90,6 +154,32 @@ class JobScheduler:
             logger.error(f"Ошибка запуска планировщика: {e}")
             raise
 
+    async def _supervisor(self):
+        """Спит до ближайшей задачи по куче сроков и запускает ее."""
+        now = datetime.now()
+        heap = [(next_run(now), job_id) for job_id, (_, _, next_run) in self.jobs.items()]
+        heapq.heapify(heap)
+
+        while heap:
+            due, job_id = heap[0]
+            now = datetime.now()
+            delay = (due - now).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            heapq.heappop(heap)
+            name, job, next_run = self.jobs[job_id]
+
+            # Как max_instances=1 в APScheduler: не запускаем задачу, пока идет прошлый запуск.
+            running = self._running.get(job_id)
+            if running is not None and not running.done():
+                logger.warning(f"Задача '{name}' еще выполняется, пропускаем запуск")
+            else:
+                self._running[job_id] = asyncio.create_task(job())
+
+            heapq.heappush(heap, (next_run(max(due, now)), job_id))
+
     async def run_initial_jobs(self):
         """Запуск начальных задач."""
         try:
@@ -105,12 +195,17 @@ class JobScheduler:
         try:
             logger.info("Запуск проверки новых объявлений для уведомлений...")
 
-            with db.get_session() as session:
-                # Получаем объявления за последние 10 минут.
-                recent_ads = session.query(ad_crud.Ad).filter(
-                    ad_crud.Ad.status == AdStatus.APPROVED,
-                    ad_crud.Ad.created_at >= datetime.now() - timedelta(minutes=10)
-                ).all()
+            async with db.get_async_session() as session:
+                # Получаем объявления за последние 10 минут: только нужные колонки, без ORM-объектов.
+                recent_ads = (await session.execute(
+                    select(
+                        Ad.id, Ad.title, Ad.description, Ad.price,
+                        Ad.location, Ad.category_id, Ad.created_at
+                    ).where(
+                        Ad.status == AdStatus.APPROVED,
+                        Ad.created_at >= datetime.now() - timedelta(minutes=10)
+                    )
+                )).all()
 
                 if not recent_ads:
                     logger.info("Нет новых объявлений для уведомлений")
@@ -118,68 +213,90 @@ class JobScheduler:
 
                 logger.info(f"Найдено {len(recent_ads)} новых объявлений")
 
-                notified_count = 0
+                # Собираем совпадения по пользователям: одно сообщение-дайджест на пользователя.
+                digests: Dict[int, Dict[str, Any]] = {}
 
                 for ad in recent_ads:
                     # Получаем поисковые запросы, соответствующие объявлению.
-                    matching_queries = search_query_crud.get_queries_for_notification(session, ad)
+                    matching_queries = await session.run_sync(
+                        search_query_crud.get_queries_for_notification, ad
+                    )
 
                     if not matching_queries:
                         continue
 
-                    # Отправляем уведомления пользователям.
+                    # Превью одинаково для всех запросов по объявлению: собираем его один раз.
+                    preview = formatter.format_ad_preview({
+                        'title': ad.title,
+                        'price': ad.price,
+                        'location': ad.location,
+                        'created_at': ad.created_at
+                    })
+                    item = f"{preview}\n[👁️ Просмотреть объявление]({ad.id})\n"
+
                     for query in matching_queries:
-                        try:
-                            user = query.user
-
-                            # Формируем сообщение.
-                            message_text = (
-                                f"🔔 *Новое объявление по вашему запросу!*\n\n"
-                                f"{formatter.format_ad_preview({
-                                    'title': ad.title,
-                                    'price': ad.price,
-                                    'location': ad.location,
-                                    'created_at': ad.created_at
-                                })}\n"
-                                f"📌 *Ваши критерии:*\n"
-                            )
+                        digest = digests.setdefault(query.user_id, {
+                            'telegram_id': query.user.telegram_id,
+                            'ads': {},
+                            'query_ids': [],
+                            'claims': []
+                        })
+                        digest['ads'][ad.id] = item
+                        digest['query_ids'].append(query.id)
+                        digest['claims'].append((query.id, ad.id))
+
+                # Фиксируем отметки до отправки: соединение и блокировки не держатся
+                # открытыми, пока идут сетевые запросы к Telegram.
+                await session.commit()
+
+            outgoing = []
+            for user_id, digest in digests.items():
+                items = list(digest['ads'].values())
+                parts = ["🔔 *Новые объявления по вашим запросам!*\n\n"]
+                parts.extend(item + "\n" for item in items[:DIGEST_MAX_ADS])
+                if len(items) > DIGEST_MAX_ADS:
+                    parts.append(f"*... и еще {len(items) - DIGEST_MAX_ADS} объявлений*")
+                outgoing.append((user_id, digest, ''.join(parts)))
+
+            # Отправляем параллельно в пределах лимитов Telegram.
+            results = await asyncio.gather(
+                *(
+                    self._send(
+                        digest['telegram_id'],
+                        message_text,
+                        parse_mode='Markdown',
+                        disable_web_page_preview=True
+                    )
+                    for _, digest, message_text in outgoing
+                ),
+                return_exceptions=True
+            )
 
-                            if query.keywords:
-                                message_text += f"• Ключевые слова: {query.keywords}\n"
-                            if query.location:
-                                message_text += f"• Местоположение: {query.location}\n"
-                            if query.min_price:
-                                message_text += f"• Цена от: {formatter.format_price(query.min_price)}\n"
-                            if query.max_price:
-                                message_text += f"• Цена до: {formatter.format_price(query.max_price)}\n"
-
-                            message_text += f"\n[👁️ Просмотреть объявление]({ad.id})"
-
-                            # Отправляем сообщение.
-                            await self.bot.send_message(
-                                chat_id=user.telegram_id,
-                                text=message_text,
-                                parse_mode='Markdown',
-                                disable_web_page_preview=True
+            notified_query_ids = []
+            failed_claims = []
+            notified_count = 0
+            for (user_id, digest, _), result in zip(outgoing, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Ошибка отправки уведомления пользователю {user_id}: {result}")
+                    failed_claims.extend(digest['claims'])
+                else:
+                    notified_query_ids.extend(digest['query_ids'])
+                    notified_count += 1
+
+            # Вторая короткая транзакция: снимаем отметки с неотправленных пар, чтобы
+            # следующий запуск попробовал снова, и одним UPDATE отмечаем отправленные запросы.
+            if outgoing:
+                async with db.get_async_session() as session:
+                    if failed_claims:
+                        await session.execute(
+                            delete(NotifiedAd).where(
+                                tuple_(NotifiedAd.query_id, NotifiedAd.ad_id).in_(failed_claims)
                             )
+                        )
+                    await session.run_sync(search_query_crud.mark_notified, notified_query_ids)
+                    await session.commit()
 
-                            # Обновляем время последнего уведомления.
-                            query.last_notified = datetime.now()
-                            session.add(query)
-
-                            notified_count += 1
-
-                            # Задержка между уведомлениями чтобы не спамить.
-                            await asyncio.sleep(0.1)
-
-                        except Exception as e:
-                            logger.error(f"Ошибка отправки уведомления пользователю {query.user_id}: {e}")
-                            continue
-
-                    # Сохраняем изменения после каждого объявления.
-                    session.commit()
-
-                logger.info(f"Отправлено {notified_count} уведомлений о новых объявлениях")
+            logger.info(f"Отправлено {notified_count} уведомлений о новых объявлениях")
 
         except Exception as e:
             logger.error(f"Ошибка в задаче уведомлений: {e}")
@@ -189,63 +306,63 @@ class JobScheduler:
         try:
             logger.info("Проверка объявлений для модерации...")
 
-            with db.get_session() as session:
+            async with db.get_async_session() as session:
                 # Количество объявлений в очереди.
-                pending_count = moderation_crud.get_pending_ads_count(session)
+                pending_count = await session.run_sync(moderation_crud.get_pending_ads_count)
 
                 if pending_count == 0:
                     logger.info("Нет объявлений для модерации")
                     return
 
                 # Получаем старые объявления (> 24 часа в очереди).
-                old_ads = session.query(moderation_crud.ModerationQueue).join(
-                    ad_crud.Ad
-                ).filter(
-                    moderation_crud.ModerationQueue.created_at <= datetime.now() - timedelta(hours=24)
-                ).all()
+                # Объявление уже в JOIN, заполняем entry.ad из него же.
+                old_ads = (await session.scalars(
+                    select(ModerationQueue).join(ModerationQueue.ad).options(
+                        contains_eager(ModerationQueue.ad)
+                    ).where(
+                        ModerationQueue.created_at <= datetime.now() - timedelta(hours=24)
+                    )
+                )).all()
 
                 if not old_ads and pending_count < 5:
                     logger.info(f"В очереди {pending_count} объявлений, но все новые")
                     return
 
                 # Получаем список модераторов.
-                moderators = session.query(user_crud.User).filter(
-                    user_crud.User.role.in_(['moderator', 'admin'])
-                ).all()
+                moderators = await self._get_recipients(
+                    session, 'moderators', User.role.in_([UserRole.MODERATOR, UserRole.ADMIN])
+                )
 
                 if not moderators:
                     logger.warning("Нет модераторов для уведомления")
                     return
 
                 # Формируем сообщение для модераторов.
-                message_text = f"⚠️ *Требуется модерация!*\n\n"
+                parts = ["⚠️ *Требуется модерация!*\n\n"]
 
                 if old_ads:
-                    message_text += f"⏰ *Старые объявления (>24ч):* {len(old_ads)}\n"
+                    parts.append(f"⏰ *Старые объявления (>24ч):* {len(old_ads)}\n")
                     for i, entry in enumerate(old_ads[:3], 1):
-                        message_text += f"{i}. '{entry.ad.title}' (ID: {entry.ad.id})\n"
+                        parts.append(f"{i}. '{entry.ad.title}' (ID: {entry.ad.id})\n")
+
+                parts.append(f"\n📋 *Всего в очереди:* {pending_count}\n")
+                parts.append("\n[👑 Перейти к модерации](moderation)")
+                # Текст одинаков для всех получателей: параметры отправки собираем один раз.
+                payload = {'text': ''.join(parts), 'parse_mode': 'Markdown'}
 
-                message_text += f"\n📋 *Всего в очереди:* {pending_count}\n"
-                message_text += f"\n[👑 Перейти к модерации](moderation)"
+                # Отправляем сообщение всем модераторам параллельно.
+                results = await asyncio.gather(
+                    *(self._send(moderator.telegram_id, **payload) for moderator in moderators),
+                    return_exceptions=True
+                )
 
-                # Отправляем сообщение каждому модератору.
                 sent_count = 0
-                for moderator in moderators:
-                    try:
-                        await self.bot.send_message(
-                            chat_id=moderator.telegram_id,
-                            text=message_text,
-                            parse_mode='Markdown'
-                        )
+                for moderator, result in zip(moderators, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Ошибка отправки уведомления модератору {moderator.id}: {result}")
+                    else:
                         sent_count += 1
 
-                        # Задержка между отправками.
-                        await asyncio.sleep(0.1)
-
-                    except Exception as e:
-                        logger.error(f"Ошибка отправки уведомления модератору {moderator.id}: {e}")
-                        continue
-
                 logger.info(f"Отправлено {sent_count} уведомлений модераторам")
 
         except Exception as e:
@@ -256,45 +373,44 @@ class JobScheduler:
         try:
             logger.info("Запуск очистки старых данных...")
 
-            with db.get_session() as session:
-                # Архивация старых объявлений (> 30 дней).
-                thirty_days_ago = datetime.now() - timedelta(days=30)
-
-                old_ads = session.query(ad_crud.Ad).filter(
-                    ad_crud.Ad.status == AdStatus.APPROVED,
-                    ad_crud.Ad.updated_at <= thirty_days_ago
-                ).all()
+            async with db.get_async_session() as session:
+                # Одна отметка времени на весь запуск.
+                now = datetime.now()
 
-                archived_count = 0
-                for ad in old_ads:
-                    ad.status = AdStatus.ARCHIVED
-                    session.add(ad)
-                    archived_count += 1
+                # Архивация старых объявлений (> 30 дней).
+                thirty_days_ago = now - timedelta(days=30)
+
+                # Один UPDATE/DELETE на таблицу, строки в сессию не загружаются.
+                archived_count = (await session.execute(
+                    update(Ad)
+                    .where(
+                        Ad.status == AdStatus.APPROVED,
+                        Ad.updated_at <= thirty_days_ago
+                    )
+                    .values(status=AdStatus.ARCHIVED)
+                    .execution_options(synchronize_session=False)
+                )).rowcount
 
                 # Очистка прочитанных уведомлений (> 7 дней).
-                seven_days_ago = datetime.now() - timedelta(days=7)
-
-                old_notifications = session.query(notification_crud.Notification).filter(
-                    notification_crud.Notification.is_read == True,
-                    notification_crud.Notification.created_at <= seven_days_ago
-                ).all()
+                seven_days_ago = now - timedelta(days=7)
 
-                deleted_notifications = 0
-                for notification in old_notifications:
-                    session.delete(notification)
-                    deleted_notifications += 1
+                deleted_notifications = (await session.execute(
+                    delete(Notification)
+                    .where(
+                        Notification.is_read == True,
+                        Notification.created_at <= seven_days_ago
+                    )
+                    .execution_options(synchronize_session=False)
+                )).rowcount
 
                 # Очистка старых поисковых запросов (> 30 дней без использования).
-                old_queries = session.query(search_query_crud.SearchQuery).filter(
-                    search_query_crud.SearchQuery.last_notified <= thirty_days_ago
-                ).all()
+                deleted_queries = (await session.execute(
+                    delete(SearchQuery)
+                    .where(SearchQuery.last_notified <= thirty_days_ago)
+                    .execution_options(synchronize_session=False)
+                )).rowcount
 
-                deleted_queries = 0
-                for query in old_queries:
-                    session.delete(query)
-                    deleted_queries += 1
-
-                session.commit()
+                await session.commit()
 
                 logger.info(
                     f"Очистка завершена: "
@@ -311,44 +427,51 @@ class JobScheduler:
         try:
             logger.info("Подготовка ежедневной статистики...")
 
-            with db.get_session() as session:
+            async with db.get_async_session() as session:
                 # Статистика за вчера.
                 yesterday = datetime.now() - timedelta(days=1)
                 yesterday_start = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
                 yesterday_end = yesterday.replace(hour=23, minute=59, second=59, microsecond=999999)
 
-                # Новые пользователи.
-                new_users = session.query(user_crud.User).filter(
-                    user_crud.User.created_at.between(yesterday_start, yesterday_end)
-                ).count()
-
-                # Новые объявления.
-                new_ads = session.query(ad_crud.Ad).filter(
-                    ad_crud.Ad.created_at.between(yesterday_start, yesterday_end)
-                ).count()
-
-                # Одобренные объявления.
-                approved_ads = session.query(ad_crud.Ad).filter(
-                    ad_crud.Ad.status == AdStatus.APPROVED,
-                    ad_crud.Ad.moderated_at.between(yesterday_start, yesterday_end)
-                ).count()
-
-                # Новые сообщения.
-                new_messages = session.query(message_crud.Message).filter(
-                    message_crud.Message.created_at.between(yesterday_start, yesterday_end)
-                ).count()
-
-                # Новые отзывы.
-                new_feedback = session.query(feedback_crud.Feedback).filter(
-                    feedback_crud.Feedback.created_at.between(yesterday_start, yesterday_end)
-                ).count()
-
-                # Общая статистика.
-                total_users = session.query(user_crud.User).count()
-                total_ads = session.query(ad_crud.Ad).count()
-                active_ads = session.query(ad_crud.Ad).filter(
-                    ad_crud.Ad.status == AdStatus.APPROVED
-                ).count()
+                # Один SELECT с COUNT(*) FILTER (WHERE ...) на таблицу вместо восьми COUNT-запросов.
+                user_stats = (await session.execute(
+                    select(
+                        func.count().filter(
+                            User.created_at.between(yesterday_start, yesterday_end)
+                        ).label('new_users'),
+                        func.count().label('total_users')
+                    ).select_from(User)
+                )).one()
+
+                ad_stats = (await session.execute(
+                    select(
+                        func.count().filter(
+                            Ad.created_at.between(yesterday_start, yesterday_end)
+                        ).label('new_ads'),
+                        func.count().filter(
+                            Ad.status == AdStatus.APPROVED,
+                            Ad.moderated_at.between(yesterday_start, yesterday_end)
+                        ).label('approved_ads'),
+                        func.count().label('total_ads'),
+                        func.count().filter(Ad.status == AdStatus.APPROVED).label('active_ads')
+                    ).select_from(Ad)
+                )).one()
+
+                activity_stats = (await session.execute(
+                    select(
+                        select(func.count()).select_from(Message).where(
+                            Message.created_at.between(yesterday_start, yesterday_end)
+                        ).scalar_subquery().label('new_messages'),
+                        select(func.count()).select_from(Feedback).where(
+                            Feedback.created_at.between(yesterday_start, yesterday_end)
+                        ).scalar_subquery().label('new_feedback')
+                    )
+                )).one()
+
+                new_users, total_users = user_stats.new_users, user_stats.total_users
+                new_ads, approved_ads = ad_stats.new_ads, ad_stats.approved_ads
+                total_ads, active_ads = ad_stats.total_ads, ad_stats.active_ads
+                new_messages, new_feedback = activity_stats.new_messages, activity_stats.new_feedback
 
                 # Формируем отчет.
                 report_date = yesterday.strftime("%d.%m.%Y")
@@ -368,30 +491,28 @@ class JobScheduler:
                 )
 
                 # Получаем админов.
-                admins = session.query(user_crud.User).filter(
-                    user_crud.User.role == 'admin'
-                ).all()
+                admins = await self._get_recipients(session, 'admins', User.role == UserRole.ADMIN)
 
                 if not admins:
-                    admins = [user for user in session.query(user_crud.User).all()
-                              if user.telegram_id in settings.ADMIN_IDS]
+                    admins = await self._get_recipients(
+                        session, 'config_admins', User.telegram_id.in_(settings.ADMIN_IDS)
+                    )
 
-                # Отправляем отчет каждому админу.
-                sent_count = 0
-                for admin in admins:
-                    try:
-                        await self.bot.send_message(
-                            chat_id=admin.telegram_id,
-                            text=stats_text,
-                            parse_mode='Markdown'
-                        )
-                        sent_count += 1
+                # Текст одинаков для всех получателей: параметры отправки собираем один раз.
+                payload = {'text': stats_text, 'parse_mode': 'Markdown'}
 
-                        await asyncio.sleep(0.1)
+                # Отправляем отчет всем админам параллельно.
+                results = await asyncio.gather(
+                    *(self._send(admin.telegram_id, **payload) for admin in admins),
+                    return_exceptions=True
+                )
 
-                    except Exception as e:
-                        logger.error(f"Ошибка отправки отчета админу {admin.id}: {e}")
-                        continue
+                sent_count = 0
+                for admin, result in zip(admins, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Ошибка отправки отчета админу {admin.id}: {result}")
+                    else:
+                        sent_count += 1
 
                 logger.info(f"Отправлен ежедневный отчет {sent_count} админам")
 
@@ -401,16 +522,17 @@ class JobScheduler:
     async def health_check(self):
         """Проверка здоровья системы."""
         try:
-            with db.get_session() as session:
-                # Проверка базы данных.
-                db_check = session.execute("SELECT 1").scalar()
-
-                # Статистика для мониторинга.
-                users_count = session.query(user_crud.User).count()
-                ads_count = session.query(ad_crud.Ad).count()
-                pending_ads = session.query(ad_crud.Ad).filter(
-                    ad_crud.Ad.status == AdStatus.PENDING
-                ).count()
+            async with db.get_async_session() as session:
+                # Проверка базы идет в том же запросе, что и статистика: литерал 1
+                # должен вернуться из базы, отдельный round trip не нужен.
+                db_check, users_count, ads_count, pending_ads = (await session.execute(
+                    select(
+                        literal(1),
+                        select(func.count()).select_from(User).scalar_subquery(),
+                        func.count(),
+                        func.count().filter(Ad.status == AdStatus.PENDING)
+                    ).select_from(Ad)
+                )).one()
 
                 health_status = {
                     'database': db_check == 1,
@@ -436,11 +558,48 @@ class JobScheduler:
                 'timestamp': datetime.now().isoformat()
             }
 
+    async def _get_recipients(self, session, key: str, condition) -> List[Any]:
+        """(id, telegram_id) получателей по условию; роли меняются редко, кэшируем на RECIPIENTS_TTL."""
+        cached = self._recipients.get(key)
+        if cached is not None and time.monotonic() - cached[0] < RECIPIENTS_TTL:
+            return cached[1]
+
+        recipients = (await session.execute(
+            select(User.id, User.telegram_id).where(condition)
+        )).all()
+        self._recipients[key] = (time.monotonic(), recipients)
+        return recipients
+
+    async def _send(self, chat_id: int, text: str, **kwargs):
+        """Отправка одного сообщения с ограничением параллельности и частоты."""
+        await self._admission.acquire()
+        try:
+            for attempt in range(1, SEND_ATTEMPTS + 1):
+                await self._bucket.acquire()
+                try:
+                    # 429 обрабатываем здесь сами: повторы AIORateLimiter выключены,
+                    # иначе они вкладываются в наши и shrink() узнает о 429 слишком поздно.
+                    await self.bot.send_message(
+                        chat_id=chat_id, text=text,
+                        rate_limit_args={'max_retries': 0}, **kwargs
+                    )
+                except RetryAfter as e:
+                    # 429: вдвое снижаем параллельность и ждем, сколько просит Telegram.
+                    await self._admission.shrink()
+                    if attempt == SEND_ATTEMPTS:
+                        raise
+                    await asyncio.sleep(e.retry_after)
+                else:
+                    await self._admission.grow()
+                    return
+        finally:
+            await self._admission.release()
+
     def stop(self):
         """Остановка планировщика."""
         try:
-            if self.scheduler.running:
-                self.scheduler.shutdown()
+            if self._supervisor_task is not None and not self._supervisor_task.done():
+                self._supervisor_task.cancel()
                 logger.info("Планировщик остановлен")
         except Exception as e:
             logger.error(f"Ошибка остановки планировщика: {e}")
@@ -0,0 +1,70 @@
+"""
+Общие фикстуры для тестов с базой данных.
+"""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.models import Base
+
+
+@pytest.fixture(scope='session')
+def engine():
+    """SQLite в памяти: схема создается один раз, одно соединение на весь прогон.
+
+    Под pytest-xdist каждый воркер - отдельный процесс со своей базой в памяти,
+    поэтому тесты разных воркеров данные не делят.
+    """
+    engine = create_engine(
+        'sqlite://',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool
+    )
+
+    # pysqlite сам управляет BEGIN и ломает SAVEPOINT; отдаем транзакции SQLAlchemy.
+    @event.listens_for(engine, 'connect')
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        # Долговечность тестовой базе не нужна: COMMIT без журнала и fsync.
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA synchronous=OFF')
+        cursor.execute('PRAGMA journal_mode=MEMORY')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA locking_mode=EXCLUSIVE')
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def do_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(engine, monkeypatch):
+    """Сессия внутри внешней транзакции, которая откатывается после теста.
+
+    commit() в коде CRUD закрывает только SAVEPOINT, поэтому данные теста
+    никогда не попадают в базу и чистить таблицы не нужно.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Как и в database.connection: после commit() объекты не перечитываются из базы.
+    TestSession = sessionmaker(
+        bind=connection,
+        join_transaction_mode='create_savepoint',
+        expire_on_commit=False
+    )
+
+    # Код, открывающий свои сессии, работает в той же транзакции.
+    monkeypatch.setattr('database.connection.db.SessionLocal', TestSession)
+
+    session = TestSession()
+    yield session
+
+    session.close()
+    transaction.rollback()
+    connection.close()
@@ -1,379 +1,307 @@
+"""
+Тесты CRUD-операций над объявлениями и пользователями.
+"""
 import pytest
-from datetime import datetime, timedelta
-from sqlalchemy.exc import IntegrityError
-
-from database.crud import (
-    create_ad,
-    get_ad_by_id,
-    get_ads_by_user,
-    get_pending_ads,
-    update_ad_status,
-    delete_ad,
-    search_ads,
-    get_ads_count,
-    get_user_by_id,
-    create_user,
-    update_user_contact,
-    get_pending_ads_count,
-)
-from database.models import Ad, User, AdStatus
-from database.session import SessionLocal
-from config.settings import settings
+from datetime import datetime
+from sqlalchemy import select
 
+from database.crud import ad_crud, user_crud, category_crud, feedback_crud, moderation_crud
+from database.models import Ad, User, AdStatus, UserRole, ModerationQueue
 
-class TestAdCRUD:
 
-    @pytest.fixture(autouse=True)
-    def setup_db(self):
-        self.db = SessionLocal()
+# Обязательные поля объявления; в тестах переопределяется только нужное.
+AD_DEFAULTS = {
+    "title": "Test ad",
+    "description": "Test ad description",
+    "price": 1000.0,
+    "location": "Москва",
+    "contact_info": "test@example.com",
+    "status": AdStatus.APPROVED,
+}
 
-        self.db.query(Ad).delete()
-        self.db.query(User).delete()
-        self.db.commit()
 
-        self.test_user = User(
-            id=1001,
-            username="testuser",
-            first_name="Test",
-            last_name="User"
-        )
-        self.db.add(self.test_user)
-        self.db.commit()
+def make_ads(session, owner_id, rows):
+    """Вставляет тестовые объявления одним INSERT и возвращает их id."""
+    rows = [{**AD_DEFAULTS, "owner_id": owner_id, **row} for row in rows]
+    session.bulk_insert_mappings(Ad, rows)
+    session.commit()
+    return session.scalars(
+        select(Ad.id).where(Ad.title.in_([row["title"] for row in rows])).order_by(Ad.id)
+    ).all()
 
-        yield
 
-        self.db.query(Ad).delete()
-        self.db.query(User).delete()
-        self.db.commit()
-        self.db.close()
+class TestAdCRUD:
 
-    def test_create_ad_valid(self):
-        ad_data = {
-            "user_id": 1001,
-            "text": "Test ad text",
-            "contact_info": "test@example.com",
-            "status": AdStatus.PENDING
-        }
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_session):
+        self.db = db_session
 
-        ad = create_ad(**ad_data)
+        self.owner = User(telegram_id=1001, username="testuser", first_name="Test", last_name="User")
+        self.other = User(telegram_id=1002, username="otheruser", first_name="Other")
+        self.db.add_all([self.owner, self.other])
+        self.db.commit()
+
+        # Счетчик очереди кэшируется на уровне процесса; тесты начинают с пустого кэша.
+        moderation_crud.invalidate_pending_count()
+
+    def test_create_ad_queues_for_moderation(self):
+        ad = ad_crud.create_ad(
+            self.db,
+            owner_id=self.owner.id,
+            title="Сдам квартиру",
+            description="Двухкомнатная, у метро",
+            price=45000,
+            location="Москва",
+            contact_info="+79990000000",
+        )
 
-        assert ad is not None
         assert ad.id is not None
-        assert ad.text == "Test ad text"
-        assert ad.contact_info == "test@example.com"
         assert ad.status == AdStatus.PENDING
-        assert ad.user_id == 1001
-
-    def test_create_ad_invalid_user(self):
-        ad_data = {
-            "user_id": 999999,
-            "text": "Test ad",
-            "contact_info": "test@example.com"
-        }
-
-        with pytest.raises(IntegrityError):
-            create_ad(**ad_data)
-
-    def test_create_ad_empty_text(self):
-        ad_data = {
-            "user_id": 1001,
-            "text": "",  # Empty text
-            "contact_info": "test@example.com"
-        }
-
-        ad = create_ad(**ad_data)
-        assert ad.text == ""
-
-    def test_create_ad_long_text(self):
-        long_text = "A" * 1000
-
-        ad_data = {
-            "user_id": 1001,
-            "text": long_text,
-            "contact_info": "test@example.com"
-        }
-
-        ad = create_ad(**ad_data)
-        assert ad.text == long_text
-        assert len(ad.text) == 1000
-
-    def test_get_ad_by_id_existing(self):
-        ad = create_ad(
-            user_id=1001,
-            text="Test ad",
-            contact_info="test@example.com"
-        )
-        ad_id = ad.id
+        assert ad.owner_id == self.owner.id
+        assert self.db.scalar(
+            select(ModerationQueue.ad_id).where(ModerationQueue.ad_id == ad.id)
+        ) == ad.id
 
-          retrieved_ad = get_ad_by_id(ad_id)
+    def test_get_ad(self):
+        [ad_id] = make_ads(self.db, self.owner.id, [{"title": "Test ad"}])
 
-        assert retrieved_ad is not None
-        assert retrieved_ad.id == ad_id
-        assert retrieved_ad.text == "Test ad"
+        ad = ad_crud.get_ad(self.db, ad_id)
 
-    def test_get_ad_by_id_nonexistent(self):
-        ad = get_ad_by_id(999999)
-        assert ad is None
+        assert ad is not None
+        assert ad.title == "Test ad"
 
-    def test_get_ad_by_id_invalid(self):
-        ad = get_ad_by_id(-1)
-        assert ad is None
+    def test_get_ad_nonexistent(self):
+        assert ad_crud.get_ad(self.db, 999999) is None
 
-        ad = get_ad_by_id(0)
-        assert ad is None
+    def test_get_user_ads(self):
+        make_ads(self.db, self.owner.id, [{"title": f"Test ad {i}"} for i in range(3)])
+        make_ads(self.db, self.other.id, [{"title": "Other user ad"}])
 
-    def test_get_ads_by_user_existing(self):
-        for i in range(3):
-            create_ad(
-                user_id=1001,
-                text=f"Test ad {i}",
-                contact_info=f"test{i}@example.com"
-            )
+        user_ads = ad_crud.get_user_ads(self.db, self.owner.id)
 
-        create_ad(
-            user_id=1002,
-            text="Other user ad",
-            contact_info="other@example.com"
-        )
+        assert len(user_ads) == 3
+        assert all(ad.owner_id == self.owner.id for ad in user_ads)
 
-        user_ads = get_ads_by_user(1001)
+    def test_get_user_ads_by_status(self):
+        make_ads(self.db, self.owner.id, [
+            {"title": "Pending 1", "status": AdStatus.PENDING},
+            {"title": "Pending 2", "status": AdStatus.PENDING},
+            {"title": "Approved", "status": AdStatus.APPROVED},
+            {"title": "Rejected", "status": AdStatus.REJECTED},
+        ])
 
-        assert len(user_ads) == 3
-        for ad in user_ads:
-            assert ad.user_id == 1001
+        pending = ad_crud.get_user_ads(self.db, self.owner.id, status=AdStatus.PENDING)
 
-    def test_get_ads_by_user_nonexistent(self):
-        user_ads = get_ads_by_user(999999)
-        assert len(user_ads) == 0
+        assert {ad.title for ad in pending} == {"Pending 1", "Pending 2"}
 
-    def test_get_ads_by_user_no_ads(self):
-        user_ads = get_ads_by_user(1001)  # User exists but has no ads
-        assert len(user_ads) == 0
+    def test_get_user_ads_no_ads(self):
+        assert ad_crud.get_user_ads(self.db, self.owner.id) == []
 
-    def test_get_pending_ads(self):
-        create_ad(user_id=1001, text="Pending 1", contact_info="test1@example.com", status=AdStatus.PENDING)
-        create_ad(user_id=1001, text="Pending 2", contact_info="test2@example.com", status=AdStatus.PENDING)
-        create_ad(user_id=1001, text="Approved", contact_info="test3@example.com", status=AdStatus.APPROVED)
-        create_ad(user_id=1001, text="Rejected", contact_info="test4@example.com", status=AdStatus.REJECTED)
+    def test_update_ad_content_requires_moderation(self):
+        [ad_id] = make_ads(self.db, self.owner.id, [{"title": "Old title"}])
 
-        pending_ads = get_pending_ads()
+        ad = ad_crud.update_ad(self.db, ad_id, self.owner.id, title="New title")
 
-        assert len(pending_ads) == 2
-        for ad in pending_ads:
-            assert ad.status == AdStatus.PENDING
+        assert ad.title == "New title"
+        assert ad.status == AdStatus.PENDING
 
-    def test_get_pending_ads_empty(self):
-        create_ad(user_id=1001, text="Approved", contact_info="test@example.com", status=AdStatus.APPROVED)
-        create_ad(user_id=1001, text="Rejected", contact_info="test@example.com", status=AdStatus.REJECTED)
+    def test_update_ad_not_owner(self):
+        [ad_id] = make_ads(self.db, self.owner.id, [{"title": "Old title"}])
 
-        pending_ads = get_pending_ads()
+        assert ad_crud.update_ad(self.db, ad_id, self.other.id, title="New title") is None
+        assert ad_crud.get_ad(self.db, ad_id).title == "Old title"
 
-        assert len(pending_ads) == 0
+    def test_delete_ad(self):
+        [ad_id] = make_ads(self.db, self.owner.id, [{"title": "Test ad"}])
 
-    def test_update_ad_status_existing(self):
-        ad = create_ad(
-            user_id=1001,
-            text="Test ad",
-            contact_info="test@example.com",
-            status=AdStatus.PENDING
-        )
+        assert ad_crud.delete_ad(self.db, ad_id, self.owner.id) is True
+        assert ad_crud.get_ad(self.db, ad_id) is None
+        # Повторное удаление ничего не находит.
+        assert ad_crud.delete_ad(self.db, ad_id, self.owner.id) is False
 
-        success = update_ad_status(ad.id, AdStatus.APPROVED)
-        assert success is True
+    def test_delete_ad_not_owner(self):
+        [ad_id] = make_ads(self.db, self.owner.id, [{"title": "Test ad"}])
 
-        updated_ad = get_ad_by_id(ad.id)
-        assert updated_ad.status == AdStatus.APPROVED
+        assert ad_crud.delete_ad(self.db, ad_id, self.other.id) is False
+        assert ad_crud.get_ad(self.db, ad_id) is not None
 
-    def test_update_ad_status_nonexistent(self):
-        success = update_ad_status(999999, AdStatus.APPROVED)
-        assert success is False
+    def test_search_ads_filters(self):
+        make_ads(self.db, self.owner.id, [
+            {"title": "Cheap Moscow", "location": "Москва", "price": 500},
+            {"title": "Expensive Moscow", "location": "Москва", "price": 5000},
+            {"title": "Cheap Kazan", "location": "Казань", "price": 500},
+            {"title": "Pending Moscow", "location": "Москва", "price": 500, "status": AdStatus.PENDING},
+        ])
 
-    def test_update_ad_status_same_status(self):
-        ad = create_ad(
-            user_id=1001,
-            text="Test ad",
-            contact_info="test@example.com",
-            status=AdStatus.PENDING
-        )
+        results = ad_crud.search_ads(self.db, location="Москва", max_price=1000)
 
-        success = update_ad_status(ad.id, AdStatus.PENDING)
-        assert success is True  # Should succeed even if status is the same
+        assert [ad.title for ad in results] == ["Cheap Moscow"]
 
-    def test_update_ad_status_invalid_status(self):
-        ad = create_ad(
-            user_id=1001,
-            text="Test ad",
-            contact_info="test@example.com"
-        )
+    def test_search_ads_by_keyword(self):
+        make_ads(self.db, self.owner.id, [
+            {"title": "Selling iPhone 12"},
+            {"title": "Buying MacBook Pro"},
+            {"title": "Phone case", "description": "Fits any iphone"},
+            {"title": "Android phone"},
+        ])
 
-        success = update_ad_status(ad.id, "INVALID_STATUS")
+        results = ad_crud.search_ads(self.db, keywords="iPhone")
 
-    def test_delete_ad_existing(self):
-        ad = create_ad(
-            user_id=1001,
-            text="Test ad",
-            contact_info="test@example.com"
-        )
-        ad_id = ad.id
+        assert {ad.title for ad in results} == {"Selling iPhone 12", "Phone case"}
 
-        success = delete_ad(ad_id)
-        assert success is True
+    def test_search_ads_keyword_wildcards_are_literal(self):
+        make_ads(self.db, self.owner.id, [
+            {"title": "Discount 50% off"},
+            {"title": "Discount 500 off"},
+        ])
 
-        deleted_ad = get_ad_by_id(ad_id)
-        assert deleted_ad is None
+        results = ad_crud.search_ads(self.db, keywords="50%")
 
-    def test_delete_ad_nonexistent(self):
-        success = delete_ad(999999)
-        assert success is False
+        assert [ad.title for ad in results] == ["Discount 50% off"]
 
-    def test_delete_ad_already_deleted(self):
-        ad = create_ad(
-            user_id=1001,
-            text="Test ad",
-            contact_info="test@example.com"
-        )
-        ad_id = ad.id
+    def test_browse_ads_pages_by_cursor(self):
+        # Одинаковый created_at, как у объявлений одной транзакции: порядок держится на id.
+        # Время задается явно, чтобы SQLite хранил его в том же формате, что и курсор.
+        created_at = datetime(2024, 1, 1, 12, 0)
+        ids = make_ads(self.db, self.owner.id, [
+            {"title": f"Ad {i}", "created_at": created_at} for i in range(5)
+        ])
 
-        success1 = delete_ad(ad_id)
-        assert success1 is True
+        first, cursor = ad_crud.browse_ads(self.db, limit=2)
+        second, cursor = ad_crud.browse_ads(self.db, limit=2, cursor=cursor)
+        third, cursor = ad_crud.browse_ads(self.db, limit=2, cursor=cursor)
 
-        success2 = delete_ad(ad_id)
-        assert success2 is False
+        seen = [ad.id for ad in first + second + third]
+        assert seen == sorted(ids, reverse=True)
+        assert cursor is None
 
-    def test_search_ads_by_keyword(self):
-        create_ad(user_id=1001, text="Selling iPhone 12", contact_info="test1@example.com", status=AdStatus.APPROVED)
-        create_ad(user_id=1001, text="Buying MacBook Pro", contact_info="test2@example.com", status=AdStatus.APPROVED)
-        create_ad(user_id=1001, text="iPhone case for sale", contact_info="test3@example.com", status=AdStatus.APPROVED)
-        create_ad(user_id=1001, text="Android phone", contact_info="test4@example.com", status=AdStatus.APPROVED)
+    def test_browse_ads_full_last_page_has_no_cursor(self):
+        created_at = datetime(2024, 1, 1, 12, 0)
+        make_ads(self.db, self.owner.id, [
+            {"title": f"Ad {i}", "created_at": created_at} for i in range(4)
+        ])
 
-        results = search_ads("iPhone")
-        assert len(results) == 2
+        first, cursor = ad_crud.browse_ads(self.db, limit=2)
+        second, cursor = ad_crud.browse_ads(self.db, limit=2, cursor=cursor)
 
-        for ad in results:
-            assert "iPhone" in ad.text
+        assert len(first) == len(second) == 2
+        assert cursor is None
 
-    def test_search_ads_empty_query(self):
-        results = search_ads("")
+    def test_get_pending_ads_count(self):
+        for i in range(2):
+            ad_crud.create_ad(
+                self.db, owner_id=self.owner.id,
+                **{**AD_DEFAULTS, "title": f"Pending {i}", "status": AdStatus.PENDING}
+            )
 
-    def test_search_ads_no_results(self):
-        create_ad(user_id=1001, text="Selling laptop", contact_info="test@example.com", status=AdStatus.APPROVED)
+        assert moderation_crud.get_pending_ads_count(self.db) == 2
 
-        results = search_ads("nonexistentkeyword")
-        assert len(results) == 0
+    def test_get_pending_ads_count_empty(self):
+        make_ads(self.db, self.owner.id, [{"title": "Approved"}])
 
-    def test_search_ads_case_insensitive(self):
-        create_ad(user_id=1001, text="Selling LAPTOP", contact_info="test@example.com", status=AdStatus.APPROVED)
+        assert moderation_crud.get_pending_ads_count(self.db) == 0
 
-        results_lower = search_ads("laptop")
-        results_upper = search_ads("LAPTOP")
 
-        assert len(results_lower) == 1
-        assert len(results_upper) == 1
+class TestUserCRUD:
 
-    def test_get_ads_count(self):
-        for i in range(5):
-            create_ad(
-                user_id=1001,
-                text=f"Ad {i}",
-                contact_info=f"test{i}@example.com",
-                status=AdStatus.APPROVED
-            )
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_session):
+        self.db = db_session
 
-        count = get_ads_count()
-        assert count >= 5
+    def test_get_or_create_new(self):
+        user = user_crud.get_or_create(self.db, 2001, username="newuser", first_name="New")
 
-    def test_get_pending_ads_count(self):
-        create_ad(user_id=1001, text="Pending 1", contact_info="test1@example.com", status=AdStatus.PENDING)
-        create_ad(user_id=1001, text="Pending 2", contact_info="test2@example.com", status=AdStatus.PENDING)
-        create_ad(user_id=1001, text="Approved", contact_info="test3@example.com", status=AdStatus.APPROVED)
+        assert user.id is not None
+        assert user.telegram_id == 2001
+        assert user.username == "newuser"
 
-        count = get_pending_ads_count()
-        assert count == 2
+    def test_get_or_create_existing(self):
+        first = user_crud.get_or_create(self.db, 3001, username="user1")
+        second = user_crud.get_or_create(self.db, 3001, username="user2")
 
-    def test_get_pending_ads_count_empty(self):
-        create_ad(user_id=1001, text="Approved", contact_info="test@example.com", status=AdStatus.APPROVED)
-        create_ad(user_id=1001, text="Rejected", contact_info="test@example.com", status=AdStatus.REJECTED)
+        assert second.id == first.id
+        assert second.username == "user1"
 
-        count = get_pending_ads_count()
-        assert count == 0
+    def test_get_by_id(self):
+        user = user_crud.get_or_create(self.db, 4001, username="testuser")
 
+        retrieved = user_crud.get_by_id(self.db, user.id)
 
-class TestUserCRUD:
+        assert retrieved is not None
+        assert retrieved.telegram_id == 4001
 
-    @pytest.fixture(autouse=True)
-    def setup_db(self):
-        self.db = SessionLocal()
+    def test_get_by_id_nonexistent(self):
+        assert user_crud.get_by_id(self.db, 999999) is None
 
-        self.db.query(User).delete()
-        self.db.commit()
+    def test_update_user(self):
+        user = user_crud.get_or_create(self.db, 5001, username="user")
 
-        yield
+        updated = user_crud.update_user(self.db, user.id, phone_number="+1234567890", unknown="ignored")
 
-        self.db.query(User).delete()
-        self.db.commit()
-        self.db.close()
+        assert updated.phone_number == "+1234567890"
 
-    def test_create_user_valid(self):
-        user_data = {
-            "id": 2001,
-            "username": "newuser",
-            "first_name": "New",
-            "last_name": "User"
-        }
+    def test_update_user_nonexistent(self):
+        assert user_crud.update_user(self.db, 999999, phone_number="123456") is None
 
-        user = create_user(**user_data)
+    def test_is_admin(self):
+        user_crud.get_or_create(self.db, 6001, role=UserRole.ADMIN)
+        user_crud.get_or_create(self.db, 6002, role=UserRole.MODERATOR)
+        user_crud.get_or_create(self.db, 6003)
 
-        assert user is not None
-        assert user.id == 2001
-        assert user.username == "newuser"
-        assert user.first_name == "New"
+        assert user_crud.is_admin(self.db, 6001)
+        assert user_crud.is_admin(self.db, 6002)
+        assert not user_crud.is_admin(self.db, 6003)
+        assert not user_crud.is_admin(self.db, 999999)
 
-    def test_create_user_duplicate_id(self):
-        create_user(id=3001, username="user1", first_name="First")
 
-        with pytest.raises(IntegrityError):
-            create_user(id=3001, username="user2", first_name="Second")
+class TestCategoryCRUD:
 
-    def test_get_user_by_id_existing(self):
-        user = create_user(id=4001, username="testuser", first_name="Test")
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_session):
+        self.db = db_session
+        # Кэш категорий живет в процессе; тест начинает с пустого.
+        category_crud.invalidate_cache()
+        yield
+        category_crud.invalidate_cache()
 
-        retrieved_user = get_user_by_id(4001)
+    def test_writes_invalidate_cached_list(self):
+        assert category_crud.get_all_categories() == []
 
-        assert retrieved_user is not None
-        assert retrieved_user.id == 4001
-        assert retrieved_user.username == "testuser"
+        category = category_crud.create_category(self.db, "Электроника", "Техника")
+        assert [c['name'] for c in category_crud.get_all_categories()] == ["Электроника"]
 
-    def test_get_user_by_id_nonexistent(self):
-        user = get_user_by_id(999999)
-        assert user is None
+        category_crud.update_category(self.db, category.id, name="Гаджеты")
+        assert category_crud.get_category(category.id)['name'] == "Гаджеты"
 
-    def test_update_user_contact_existing(self):
-        user = create_user(id=5001, username="user", first_name="Test")
+        category_crud.update_category(self.db, category.id, is_active=False)
+        assert category_crud.get_category(category.id) is None
 
-        success = update_user_contact(5001, "new@example.com", "+1234567890")
-        assert success is True
 
-        updated_user = get_user_by_id(5001)
-        assert updated_user.email == "new@example.com"
-        assert updated_user.phone == "+1234567890"
+class TestFeedbackCRUD:
 
-    def test_update_user_contact_nonexistent(self):
-        success = update_user_contact(999999, "test@example.com", "123456")
-        assert success is False
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_session):
+        self.db = db_session
+
+        self.owner = User(telegram_id=7001, username="owner")
+        self.rater = User(telegram_id=7002, username="rater")
+        self.db.add_all([self.owner, self.rater])
+        self.db.commit()
+        [self.ad_id] = make_ads(self.db, self.owner.id, [{"title": "Rated ad"}])
 
-    def test_update_user_contact_partial(self):
-        user = create_user(id=6001, username="user", first_name="Test")
+    def test_rating_aggregate_follows_every_write(self):
+        first = feedback_crud.create_feedback(self.db, self.rater.id, 5, ad_id=self.ad_id)
+        feedback_crud.create_feedback(self.db, self.owner.id, 3, ad_id=self.ad_id)
+        assert feedback_crud.get_average_rating(self.db, self.ad_id) == (4.0, 2)
 
-        success = update_user_contact(6001, "email@example.com", None)
-        assert success is True
+        feedback_crud.update_feedback(self.db, first.id, self.rater.id, rating=1)
+        assert feedback_crud.get_average_rating(self.db, self.ad_id) == (2.0, 2)
 
-        updated_user = get_user_by_id(6001)
-        assert updated_user.email == "email@example.com"
-        assert updated_user.phone is None
+        assert feedback_crud.delete_feedback(self.db, first.id, self.rater.id) is True
+        assert feedback_crud.get_average_rating(self.db, self.ad_id) == (3.0, 1)
 
-        success = update_user_contact(6001, None, "+123456")
-        assert success is True
+    def test_delete_feedback_not_author(self):
+        feedback = feedback_crud.create_feedback(self.db, self.rater.id, 5, ad_id=self.ad_id)
 
-        updated_user = get_user_by_id(6001)
-        assert updated_user.email == "email@example.com"
-        assert updated_user.phone == "+123456"
+        assert feedback_crud.delete_feedback(self.db, feedback.id, self.owner.id) is False
+        assert feedback_crud.get_average_rating(self.db, self.ad_id) == (5.0, 1)
@@ -1,332 +1,241 @@
 import pytest
-from unittest.mock import AsyncMock, Mock, patch
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import ANY, AsyncMock, Mock, patch
 from telegram import Update, Message, Chat, User, CallbackQuery
 from telegram.ext import ContextTypes
 
-from bot.handlers import ads, start, common
+from bot.handlers import ads
 from database.models import AdStatus
 from config.settings import settings
 
+# Mock(spec=<class>) заново обходит dir() класса и ищет корутины на каждом вызове;
+# со списком имен атрибутов этот обход делается один раз при импорте модуля.
+_UPDATE_SPEC = dir(Update)
+_MESSAGE_SPEC = dir(Message)
+_USER_SPEC = dir(User)
+_CALLBACK_SPEC = dir(CallbackQuery)
+_CONTEXT_SPEC = dir(ContextTypes.DEFAULT_TYPE)
+
+
+def _assert_reply_contains(mock_send, *needles):
+    """Проверяет, что текст последнего ответа содержит все подстроки."""
+    text = mock_send.call_args[0][0]
+    missing = [needle for needle in needles if needle not in text]
+    assert not missing, f"{missing} not found in {text!r}"
+
+
+@pytest.fixture(scope="module")
+def _db_patchers():
+    # Сессия db - MagicMock: with db.get_session() работает без базы.
+    patchers = [
+        patch('bot.handlers.ads.db'),
+        patch('bot.handlers.ads.user_crud'),
+        patch('bot.handlers.ads.ad_crud'),
+    ]
+    _, _, stub_ad_crud = (patcher.start() for patcher in patchers)
+    yield SimpleNamespace(
+        get=stub_ad_crud.get_ad,
+        upd=stub_ad_crud.moderate_ad,
+        delete=stub_ad_crud.delete_ad,
+    )
+    for patcher in patchers:
+        patcher.stop()
+
+
+@pytest.fixture(autouse=True)
+def patched_db(_db_patchers):
+    """Моки CRUD создаются один раз на модуль, здесь только сбрасываются."""
+    for stub in (_db_patchers.get, _db_patchers.upd, _db_patchers.delete):
+        stub.reset_mock(return_value=True, side_effect=True)
+    return _db_patchers
+
+
+@pytest.fixture(scope="module")
+def mock_callback():
+    callback = Mock(spec=_CALLBACK_SPEC)
+    callback.data = "manage_ad_1"
+    callback.answer = AsyncMock()
+    callback.edit_message_text = AsyncMock()
+    return callback
+
+
+@pytest.fixture(scope="module")
+def mock_update(mock_callback):
+    update = Mock(spec=_UPDATE_SPEC)
+    update.effective_user = Mock(spec=_USER_SPEC)
+    update.effective_user.id = 123456
+    update.callback_query = mock_callback
+    return update
+
+
+@pytest.fixture
+def as_admin(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_IDS", [123456])
+    return 123456
+
+
+@pytest.fixture(scope="module")
+def mock_context():
+    context = Mock(spec=_CONTEXT_SPEC)
+    context.user_data = {}
+    context.bot_data = {}
+    return context
+
+
+@pytest.fixture(autouse=True)
+def _reset_mocks(mock_update, mock_context):
+    """Моки строятся один раз на модуль; перед каждым тестом возвращаем их в исходное состояние."""
+    mock_update.effective_user.id = 123456
+    mock_update.callback_query.data = "manage_ad_1"
+    mock_update.callback_query.answer.reset_mock()
+    mock_update.callback_query.edit_message_text.reset_mock()
+    mock_context.user_data = {}
+    mock_context.bot_data = {}
+
 
 class TestAdsHandlers:
+    pytestmark = pytest.mark.asyncio(scope="module")
 
-    @pytest.fixture
-    def mock_update(self):
-        update = Mock(spec=Update)
-        update.effective_user = Mock(spec=User)
-        update.effective_user.id = 123456
-        update.callback_query = Mock(spec=CallbackQuery)
-        update.callback_query.data = "manage_ad_1"
-        update.callback_query.answer = AsyncMock()
-        update.callback_query.edit_message_text = AsyncMock()
-        return update
+    async def test_manage_ad_valid_callback(self, mock_update, mock_context, as_admin, patched_db):
+        mock_update.effective_user.id = as_admin
 
-    @pytest.fixture
-    def mock_context(self):
-        context = Mock(spec=ContextTypes.DEFAULT_TYPE)
-        context.user_data = {}
-        context.bot_data = {}
-        return context
-
-    @pytest.mark.asyncio
-    async def test_manage_ad_valid_callback(self, mock_update, mock_context):
-        with patch('bot.handlers.ads.get_ad_by_id') as mock_get_ad:
-            mock_ad = Mock()
-            mock_ad.id = 1
-            mock_ad.user_id = 123
-            mock_ad.created_at = "2024-01-01"
-            mock_ad.text = "Test ad text"
-            mock_ad.contact_info = "test@example.com"
-            mock_ad.status = AdStatus.PENDING
-            mock_ad.photo_url = None
-            mock_get_ad.return_value = mock_ad
-
-            original_admin_ids = settings.ADMIN_IDS
-            settings.ADMIN_IDS = [123456]
-
-            try:
-                await ads.manage_ad(mock_update, mock_context)
-
-                mock_update.callback_query.answer.assert_called_once()
-
-                mock_update.callback_query.edit_message_text.assert_called_once()
-
-            finally:
-                settings.ADMIN_IDS = original_admin_ids
-
-    @pytest.mark.asyncio
-    async def test_manage_ad_invalid_callback_format(self, mock_update, mock_context):
-        mock_update.callback_query.data = "invalid_format"
+        mock_ad = Mock()
+        mock_ad.id = 1
+        mock_ad.owner_id = 123
+        mock_ad.created_at = datetime(2024, 1, 1, 12, 0)
+        mock_ad.title = "Test ad"
+        mock_ad.description = "Test ad text"
+        mock_ad.contact_info = "test@example.com"
+        mock_ad.status = AdStatus.PENDING
+        patched_db.get.return_value = mock_ad
 
         await ads.manage_ad(mock_update, mock_context)
 
+        mock_update.callback_query.answer.assert_called_once()
+        patched_db.get.assert_called_once_with(ANY, 1)
+
         mock_update.callback_query.edit_message_text.assert_called_once()
-        call_args = mock_update.callback_query.edit_message_text.call_args[0][0]
-        assert "❌ Произошла ошибка" in call_args
+        _assert_reply_contains(mock_update.callback_query.edit_message_text, "#1", "Test ad text")
+        assert mock_context.user_data['current_ad_id'] == 1
 
-    @pytest.mark.asyncio
-    async def test_manage_ad_non_numeric_ad_id(self, mock_update, mock_context):
-        mock_update.callback_query.data = "manage_ad_abc"
+    @pytest.mark.parametrize("data", ["invalid_format", "manage_ad_abc", "manage_ad"])
+    async def test_manage_ad_bad_callback(self, mock_update, mock_context, data):
+        mock_update.callback_query.data = data
 
         await ads.manage_ad(mock_update, mock_context)
 
         mock_update.callback_query.edit_message_text.assert_called_once()
+        _assert_reply_contains(mock_update.callback_query.edit_message_text, "❌ Произошла ошибка")
 
-    @pytest.mark.asyncio
-    async def test_manage_ad_short_callback(self, mock_update, mock_context):
-        mock_update.callback_query.data = "manage_ad"
+    async def test_manage_ad_nonexistent_ad(self, mock_update, mock_context, as_admin, patched_db):
+        mock_update.effective_user.id = as_admin
+        patched_db.get.return_value = None
 
         await ads.manage_ad(mock_update, mock_context)
 
         mock_update.callback_query.edit_message_text.assert_called_once()
+        _assert_reply_contains(mock_update.callback_query.edit_message_text, "не найдено")
 
-    @pytest.mark.asyncio
-    async def test_manage_ad_nonexistent_ad(self, mock_update, mock_context):
-        with patch('bot.handlers.ads.get_ad_by_id') as mock_get_ad:
-            mock_get_ad.return_value = None
-
-            original_admin_ids = settings.ADMIN_IDS
-            settings.ADMIN_IDS = [123456]
-
-            try:
-                await ads.manage_ad(mock_update, mock_context)
-
-                mock_update.callback_query.edit_message_text.assert_called_once()
-                call_args = mock_update.callback_query.edit_message_text.call_args[0][0]
-                assert "не найдено" in call_args
-
-            finally:
-                settings.ADMIN_IDS = original_admin_ids
-
-    @pytest.mark.asyncio
-    async def test_manage_ad_non_admin_user(self, mock_update, mock_context):
+    async def test_manage_ad_non_admin_user(self, mock_update, mock_context, monkeypatch, patched_db):
         mock_update.effective_user.id = 999999  # Non-admin
+        monkeypatch.setattr(settings, "ADMIN_IDS", [123456, 654321])
+        patched_db.get.return_value = Mock()
+
+        await ads.manage_ad(mock_update, mock_context)
 
-        with patch('bot.handlers.ads.get_ad_by_id') as mock_get_ad:
-            mock_ad = Mock()
-            mock_get_ad.return_value = mock_ad
-            original_admin_ids = settings.ADMIN_IDS
-            settings.ADMIN_IDS = [123456, 654321]
+        mock_update.callback_query.edit_message_text.assert_called_once()
+        _assert_reply_contains(mock_update.callback_query.edit_message_text, "нет прав")
 
-            try:
-                await ads.manage_ad(mock_update, mock_context)
+    async def test_approve_ad_valid(self, mock_update, mock_context, patched_db):
+        mock_update.callback_query.data = "approve_ad_1"
+        patched_db.upd.return_value = True
 
-                mock_update.callback_query.edit_message_text.assert_called_once()
-                call_args = mock_update.callback_query.edit_message_text.call_args[0][0]
-                assert "нет прав" in call_args
+        await ads.approve_ad(mock_update, mock_context)
 
-            finally:
-                settings.ADMIN_IDS = original_admin_ids
+        patched_db.upd.assert_called_once_with(ANY, 1, AdStatus.APPROVED, ANY)
+        mock_update.callback_query.edit_message_text.assert_called_once()
+        _assert_reply_contains(mock_update.callback_query.edit_message_text, "одобрено")
 
-    @pytest.mark.asyncio
-    async def test_approve_ad_valid(self, mock_update, mock_context):
+    async def test_approve_ad_missing(self, mock_update, mock_context, patched_db):
         mock_update.callback_query.data = "approve_ad_1"
+        patched_db.upd.return_value = None
 
-        with patch('bot.handlers.ads.update_ad_status') as mock_update_status:
-            mock_update_status.return_value = True
-
-            await ads.approve_ad(mock_update, mock_context)
+        await ads.approve_ad(mock_update, mock_context)
 
-            mock_update.callback_query.edit_message_text.assert_called_once()
-            call_args = mock_update.callback_query.edit_message_text.call_args[0][0]
-            assert "одобрено" in call_args
+        _assert_reply_contains(mock_update.callback_query.edit_message_text, "Не удалось")
 
-    @pytest.mark.asyncio
     async def test_approve_ad_invalid_format(self, mock_update, mock_context):
         mock_update.callback_query.data = "approve_ad"
 
         await ads.approve_ad(mock_update, mock_context)
 
         mock_update.callback_query.edit_message_text.assert_called_once()
-        assert "Ошибка" in mock_update.callback_query.edit_message_text.call_args[0][0]
+        _assert_reply_contains(mock_update.callback_query.edit_message_text, "Ошибка")
 
-    @pytest.mark.asyncio
-    async def test_reject_ad_valid(self, mock_update, mock_context):
+    async def test_reject_ad_valid(self, mock_update, mock_context, patched_db):
         mock_update.callback_query.data = "reject_ad_1"
+        patched_db.upd.return_value = True
 
-        with patch('bot.handlers.ads.update_ad_status') as mock_update_status:
-            mock_update_status.return_value = True
-
-            await ads.reject_ad(mock_update, mock_context)
+        await ads.reject_ad(mock_update, mock_context)
 
-            mock_update.callback_query.edit_message_text.assert_called_once()
-            call_args = mock_update.callback_query.edit_message_text.call_args[0][0]
-            assert "отклонено" in call_args
+        mock_update.callback_query.edit_message_text.assert_called_once()
+        _assert_reply_contains(mock_update.callback_query.edit_message_text, "отклонено")
 
-    @pytest.mark.asyncio
     async def test_confirm_delete_ad(self, mock_update, mock_context):
         mock_update.callback_query.data = "delete_ad_1"
 
         await ads.confirm_delete_ad(mock_update, mock_context)
 
         mock_update.callback_query.edit_message_text.assert_called_once()
-        call_args = mock_update.callback_query.edit_message_text.call_args[0][0]
-        assert "уверены" in call_args
-        assert "удалить" in call_args
-
-
-class TestConversationHandler:
+        _assert_reply_contains(mock_update.callback_query.edit_message_text, "уверены", "удалить")
 
-    @pytest.mark.asyncio
-    async def test_conversation_flow(self):
-        """Тестирование полного потока диалога создания объявления."""
-        update = Mock(spec=Update)
-        update.message = Mock(spec=Message)
-        update.message.reply_text = AsyncMock()
-        update.message.text = "Новое объявление"
-        update.message.from_user = Mock(spec=User)
-        update.message.from_user.id = 123456
+    async def test_execute_delete_ad(self, mock_update, mock_context, patched_db):
+        mock_update.callback_query.data = "confirm_delete_yes_1"
+        patched_db.get.return_value = Mock(owner_id=123)
+        patched_db.delete.return_value = True
 
-        context = Mock(spec=ContextTypes.DEFAULT_TYPE)
-        context.user_data = {}
+        await ads.execute_delete_ad(mock_update, mock_context)
 
-        result = await ads.start_ad_creation(update, context)
-        assert result == 0
-        update.message.reply_text.assert_called_with("📝 Отправьте текст объявления:")
+        # Администратор удаляет объявление от имени владельца.
+        patched_db.delete.assert_called_once_with(ANY, 1, 123)
+        _assert_reply_contains(mock_update.callback_query.edit_message_text, "удалено")
 
-        update.message.text = "Тестовое объявление"
-        update.message.contact = None
-
-        result = await ads.receive_ad_text(update, context)
-        assert result == 1
-        assert context.user_data['ad_text'] == "Тестовое объявление"
-        update.message.reply_text.assert_called_with(
-            "📱 Отправьте контактные данные или нажмите кнопку ниже:",
-            reply_markup=ANY
-        )
+    async def test_execute_delete_ad_declined(self, mock_update, mock_context, patched_db):
+        mock_update.callback_query.data = "confirm_delete_no_1"
 
-        mock_contact = Mock()
-        mock_contact.phone_number = "+79991234567"
-        update.message.contact = mock_contact
-        update.message.text = None
+        await ads.execute_delete_ad(mock_update, mock_context)
 
-        with patch('bot.handlers.ads.create_ad') as mock_create_ad:
-            mock_create_ad.return_value = Mock(id=1)
+        patched_db.delete.assert_not_called()
+        _assert_reply_contains(mock_update.callback_query.edit_message_text, "отменено")
 
-            result = await ads.receive_contact(update, context)
-            assert result == -1
 
-            mock_create_ad.assert_called_once_with(
-                user_id=123456,
-                text="Тестовое объявление",
-                contact_info="+79991234567"
-            )
-
-            update.message.reply_text.assert_called_with(
-                "✅ Объявление создано и отправлено на модерацию!"
-            )
+class TestConversationHandler:
+    pytestmark = pytest.mark.asyncio(scope="module")
 
-    @pytest.mark.asyncio
-    async def test_conversation_flow_with_photo(self):
-        """Тестирование диалога с добавлением фото"""
-        update = Mock(spec=Update)
-        update.message = Mock(spec=Message)
+    @pytest.fixture
+    def conv_setup(self, mock_context):
+        update = Mock(spec=_UPDATE_SPEC)
+        update.message = Mock(spec=_MESSAGE_SPEC)
         update.message.reply_text = AsyncMock()
-        update.message.from_user = Mock(spec=User)
+        update.message.from_user = Mock(spec=_USER_SPEC)
         update.message.from_user.id = 123456
-
-        context = Mock(spec=ContextTypes.DEFAULT_TYPE)
-        context.user_data = {}
-
-        result = await ads.start_ad_creation(update, context)
-        assert result == 0
-
-        update.message.text = "Объявление с фото"
-        update.message.photo = [Mock(file_id="photo123")]
-
-        result = await ads.receive_ad_text(update, context)
-        assert result == 1
-        assert context.user_data['ad_text'] == "Объявление с фото"
-        assert context.user_data['photo'] == "photo123"
-
-        update.message.text = "test@example.com"
-        update.message.contact = None
-
-        with patch('bot.handlers.ads.create_ad') as mock_create_ad:
-            mock_create_ad.return_value = Mock(id=1)
-
-            result = await ads.receive_contact(update, context)
-            assert result == -1
-            mock_create_ad.assert_called_once_with(
-                user_id=123456,
-                text="Объявление с фото",
-                contact_info="test@example.com",
-                photo_url="photo123"
-            )
-
-    @pytest.mark.asyncio
-    async def test_conversation_cancel_during_flow(self):
+        return update, mock_context
+
+    @pytest.mark.parametrize("user_data", [
+        {},
+        {"ad_text": "черновик"},
+        {"ad_text": "черновик", "photo": "photo123"},
+    ])
+    async def test_conversation_cancel(self, conv_setup, user_data):
         """Тестирование отмены диалога на разных этапах."""
-        update = Mock(spec=Update)
-        update.message = Mock(spec=Message)
-        update.message.reply_text = AsyncMock()
+        update, context = conv_setup
         update.message.text = "/cancel"
-
-        context = Mock(spec=ContextTypes.DEFAULT_TYPE)
-        context.user_data = {"ad_text": "черновик"}
-
-        result = await ads.cancel(update, context)
-        assert result == -1
-        assert "ad_text" not in context.user_data
-        update.message.reply_text.assert_called_with(
-            "Операция отменена.",
-            reply_markup=None
-        )
-
-        update.message.reply_text.reset_mock()
-        context.user_data = {"ad_text": "черновик", "photo": "photo123"}
+        context.user_data = dict(user_data)
 
         result = await ads.cancel(update, context)
         assert result == -1
         assert context.user_data == {}
-        update.message.reply_text.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_conversation_invalid_input(self):
-        """Тестирование обработки некорректного ввода."""
-        update = Mock(spec=Update)
-        update.message = Mock(spec=Message)
-        update.message.reply_text = AsyncMock()
-        update.message.from_user = Mock(spec=User)
-
-        context = Mock(spec=ContextTypes.DEFAULT_TYPE)
-        context.user_data = {}
-
-        update.message.text = ""
-        result = await ads.receive_ad_text(update, context)
-        assert result == 0
-        update.message.reply_text.assert_called_with(
-            "❌ Текст не может быть пустым. Попробуйте снова:"
-        )
-
-        update.message.text = "a" * 5000
-        update.message.reply_text.reset_mock()
-
-        result = await ads.receive_ad_text(update, context)
-        assert result == 0
-        update.message.reply_text.assert_called_with(
-            "❌ Текст слишком длинный. Максимум 4096 символов. Попробуйте снова:"
-        )
-
-        update.message.text = ""
-        update.message.contact = None
-
-        result = await ads.receive_contact(update, context)
-        assert result == 1
-        update.message.reply_text.assert_called_with(
-            "❌ Контактные данные не могут быть пустыми. Попробуйте снова:"
-        )
-
-    @pytest.mark.asyncio
-    async def test_conversation_cancel(self):
-        update = Mock(spec=Update)
-        update.message = Mock(spec=Message)
-        update.message.reply_text = AsyncMock()
-
-        context = Mock(spec=ContextTypes.DEFAULT_TYPE)
-
-        await ads.cancel(update, context)
-
         update.message.reply_text.assert_called_once_with(
             "Операция отменена.",
             reply_markup=None
@@ -334,52 +243,43 @@ class TestConversationHandler:
 
 
 class TestEdgeCases:
+    pytestmark = pytest.mark.asyncio(scope="module")
 
-    @pytest.mark.asyncio
-    async def test_empty_callback_data(self):
-        update = Mock(spec=Update)
-        update.callback_query = Mock(spec=CallbackQuery)
-        update.callback_query.data = ""
+    @pytest.fixture(scope="class")
+    def edge_update_template(self):
+        update = Mock(spec=_UPDATE_SPEC)
+        update.effective_user = Mock(spec=_USER_SPEC)
+        update.callback_query = Mock(spec=_CALLBACK_SPEC)
         update.callback_query.answer = AsyncMock()
         update.callback_query.edit_message_text = AsyncMock()
+        return update
 
-        context = Mock(spec=ContextTypes.DEFAULT_TYPE)
-
-        await ads.manage_ad(update, context)
-
-        update.callback_query.answer.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_none_callback_query(self):
-        update = Mock(spec=Update)
-        update.callback_query = None
-
-        context = Mock(spec=ContextTypes.DEFAULT_TYPE)
-
-        await ads.manage_ad(update, context)
-
-    @pytest.mark.asyncio
-    async def test_large_ad_id(self):
-        update = Mock(spec=Update)
-        update.effective_user = Mock(spec=User)
+    @pytest.fixture
+    def edge_update(self, edge_update_template):
+        """Шаблон строится один раз на класс, тест получает его со сброшенными моками."""
+        update = edge_update_template
         update.effective_user.id = 123456
-        update.callback_query = Mock(spec=CallbackQuery)
-        update.callback_query.data = "manage_ad_9999999999"
-        update.callback_query.answer = AsyncMock()
-        update.callback_query.edit_message_text = AsyncMock()
+        update.callback_query.answer.reset_mock()
+        update.callback_query.edit_message_text.reset_mock()
+        return update
+
+    async def test_empty_callback_data(self, edge_update, mock_context):
+        edge_update.callback_query.data = ""
 
-        context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        await ads.manage_ad(edge_update, mock_context)
 
-        with patch('bot.handlers.ads.get_ad_by_id') as mock_get_ad:
-            mock_get_ad.return_value = None
+        # Пустой callback игнорируется без ответа пользователю.
+        edge_update.callback_query.answer.assert_not_called()
+        edge_update.callback_query.edit_message_text.assert_not_called()
 
-            original_admin_ids = settings.ADMIN_IDS
-            settings.ADMIN_IDS = [123456]
+    async def test_none_callback_query(self, mock_context):
+        await ads.manage_ad(SimpleNamespace(callback_query=None), mock_context)
 
-            try:
-                await ads.manage_ad(update, context)
+    async def test_large_ad_id(self, edge_update, mock_context, as_admin, patched_db):
+        edge_update.effective_user.id = as_admin
+        edge_update.callback_query.data = "manage_ad_9999999999"
+        patched_db.get.return_value = None
 
-                mock_update.callback_query.answer.assert_called_once()
+        await ads.manage_ad(edge_update, mock_context)
 
-            finally:
-                settings.ADMIN_IDS = original_admin_ids
+        edge_update.callback_query.answer.assert_called_once()
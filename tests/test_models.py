@@ -2,41 +2,45 @@
 Тесты для моделей базы данных
 """
 import pytest
-import asyncio
-from datetime import datetime, timedelta
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import event, func, insert, select, update, delete
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import selectinload
 
-from database.models import Base, User, Ad, AdStatus, Category, Message, Feedback
-from database.connection import db
+from database.connection import _raise_on_lazy_load
 
+from database.models import User, Ad, AdStatus, Category, Message, Feedback
 
-class TestDatabaseModels:
-    """Тесты моделей базы данных."""
 
-    @classmethod
-    def setup_class(cls):
-        """Настройка тестового окружения."""
-        # Создаем тестовую базу данных в памяти.
-        cls.engine = create_engine('sqlite:///:memory:')
-        cls.Session = sessionmaker(bind=cls.engine)
+@pytest.fixture(scope="module")
+def seeded(engine):
+    """Пользователи и категория, общие для тестов модуля: создаются один раз и удаляются в конце."""
+    with engine.begin() as conn:
+        owner = conn.execute(
+            insert(User).values(telegram_id=900000001, username="seed_owner").returning(User.id)
+        ).scalar_one()
+        receiver = conn.execute(
+            insert(User).values(telegram_id=900000002, username="seed_receiver").returning(User.id)
+        ).scalar_one()
+        category = conn.execute(
+            insert(Category).values(name="Электроника", description="Техника и гаджеты").returning(Category.id)
+        ).scalar_one()
 
-        # Создаем таблицы.
-        Base.metadata.create_all(cls.engine)
+    yield SimpleNamespace(owner=owner, receiver=receiver, category=category)
 
-    @classmethod
-    def teardown_class(cls):
-        """Очистка после тестов."""
-        Base.metadata.drop_all(cls.engine)
+    with engine.begin() as conn:
+        conn.execute(delete(Category).where(Category.id == category))
+        conn.execute(delete(User).where(User.id.in_([owner, receiver])))
 
-    def setup_method(self):
-        """Настройка перед каждым тестом."""
-        self.session = self.Session()
 
-    def teardown_method(self):
-        """Очистка после каждого теста."""
-        self.session.rollback()
-        self.session.close()
+class TestDatabaseModels:
+    """Тесты моделей базы данных."""
+
+    @pytest.fixture(autouse=True)
+    def _session(self, db_session):
+        """Общая схема из conftest, каждый тест откатывается целиком."""
+        self.session = db_session
 
     def test_create_user(self):
         """Тест создания пользователя."""
@@ -48,30 +52,17 @@ class TestDatabaseModels:
         )
 
         self.session.add(user)
-        self.session.commit()
+        self.session.flush()
 
         assert user.id is not None
         assert user.telegram_id == 123456789
         assert user.username == "test_user"
         assert user.created_at is not None
 
-    def test_create_ad(self):
+    def test_create_ad(self, seeded):
         """Тест создания объявления."""
-        # Создаем пользователя.
-        user = User(
-            telegram_id=123456789,
-            username="ad_owner"
-        )
-        self.session.add(user)
-        self.session.commit()
-
-        # Создаем категорию.
-        category = Category(
-            name="Электроника",
-            description="Техника и гаджеты"
-        )
-        self.session.add(category)
-        self.session.commit()
+        user = self.session.get(User, seeded.owner)
+        category = self.session.get(Category, seeded.category)
 
         # Создаем объявление.
         ad = Ad(
@@ -86,7 +77,7 @@ class TestDatabaseModels:
         )
 
         self.session.add(ad)
-        self.session.commit()
+        self.session.flush()
 
         assert ad.id is not None
         assert ad.title == "Тестовое объявление"
@@ -104,15 +95,10 @@ class TestDatabaseModels:
         assert AdStatus.RENTED.value == "rented"
         assert AdStatus.ARCHIVED.value == "archived"
 
-    def test_create_message(self):
+    def test_create_message(self, seeded):
         """Тест создания сообщения."""
-        # Создаем пользователей.
-        sender = User(telegram_id=111111111, username="sender")
-        receiver = User(telegram_id=222222222, username="receiver")
-
-        self.session.add(sender)
-        self.session.add(receiver)
-        self.session.commit()
+        sender = self.session.get(User, seeded.owner)
+        receiver = self.session.get(User, seeded.receiver)
 
         # Создаем сообщение.
         message = Message(
@@ -122,7 +108,7 @@ class TestDatabaseModels:
         )
 
         self.session.add(message)
-        self.session.commit()
+        self.session.flush()
 
         assert message.id is not None
         assert message.content == "Тестовое сообщение"
@@ -130,12 +116,9 @@ class TestDatabaseModels:
         assert message.sender == sender
         assert message.receiver == receiver
 
-    def test_create_feedback(self):
+    def test_create_feedback(self, seeded):
         """Тест создания отзыва."""
-        # Создаем пользователя.
-        user = User(telegram_id=333333333, username="feedback_user")
-        self.session.add(user)
-        self.session.commit()
+        user = self.session.get(User, seeded.owner)
 
         # Создаем отзыв.
         feedback = Feedback(
@@ -146,7 +129,7 @@ class TestDatabaseModels:
         )
 
         self.session.add(feedback)
-        self.session.commit()
+        self.session.flush()
 
         assert feedback.id is not None
         assert feedback.rating == 5
@@ -154,13 +137,8 @@ class TestDatabaseModels:
         assert feedback.type == "bot"
         assert feedback.user == user
 
-    def test_relationships(self):
+    def test_relationships(self, seeded):
         """Тест связей между моделями."""
-        # Создаем пользователя.
-        user = User(telegram_id=444444444, username="rel_user")
-        self.session.add(user)
-        self.session.commit()
-
         # Создаем несколько объявлений.
         ad1 = Ad(
             title="Объявление 1",
@@ -168,7 +146,7 @@ class TestDatabaseModels:
             price=100,
             location="Локация 1",
             contact_info="@user",
-            owner_id=user.id,
+            owner_id=seeded.owner,
             status=AdStatus.APPROVED
         )
 
@@ -178,13 +156,21 @@ class TestDatabaseModels:
             price=200,
             location="Локация 2",
             contact_info="@user",
-            owner_id=user.id,
+            owner_id=seeded.owner,
             status=AdStatus.APPROVED
         )
 
         self.session.add_all([ad1, ad2])
         self.session.commit()
 
+        # Пользователь и его объявления одним запросом, без ленивой загрузки user.ads.
+        user = (
+            self.session.query(User)
+            .options(selectinload(User.ads))
+            .filter_by(id=seeded.owner)
+            .one()
+        )
+
         # Проверяем связи.
         assert len(user.ads) == 2
         assert ad1 in user.ads
@@ -192,90 +178,119 @@ class TestDatabaseModels:
         assert ad1.owner == user
         assert ad2.owner == user
 
+    def test_lazy_load_raises_in_debug(self, seeded):
+        """В режиме DEBUG незагруженная связь падает вместо отдельного SELECT."""
+        ad_id = self.session.execute(
+            insert(Ad)
+            .values(
+                title="Объявление",
+                description="Описание",
+                price=100,
+                location="Москва",
+                contact_info="@user",
+                owner_id=seeded.owner
+            )
+            .returning(Ad.id)
+        ).scalar_one()
+
+        # Тот же обработчик, что database.connection вешает при settings.DEBUG.
+        event.listen(self.session, 'do_orm_execute', _raise_on_lazy_load)
+        try:
+            ad = self.session.scalars(select(Ad).where(Ad.id == ad_id)).one()
+            with pytest.raises(InvalidRequestError):
+                ad.owner
+
+            # Явно загруженная связь и запросы без сущностей работают как обычно.
+            ad = self.session.scalars(
+                select(Ad).options(selectinload(Ad.owner)).where(Ad.id == ad_id)
+                .execution_options(populate_existing=True)
+            ).one()
+            assert ad.owner.id == seeded.owner
+            assert self.session.scalar(select(func.count()).select_from(Ad)) >= 1
+        finally:
+            event.remove(self.session, 'do_orm_execute', _raise_on_lazy_load)
+
     def test_timestamps(self):
         """Тест временных меток."""
-        user = User(telegram_id=555555555, username="timestamp_user")
-        self.session.add(user)
-        self.session.commit()
+        user = self.session.execute(
+            insert(User)
+            .values(telegram_id=555555555, username="timestamp_user")
+            .returning(User.id, User.created_at, User.updated_at)
+        ).one()
 
         # Проверяем created_at.
         assert user.created_at is not None
         assert isinstance(user.created_at, datetime)
 
         # Обновляем пользователя.
-        original_updated = user.updated_at
-        user.username = "updated_user"
-        self.session.commit()
+        updated_at = self.session.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(username="updated_user")
+            .returning(User.updated_at)
+        ).scalar_one()
 
         # Проверяем updated_at.
-        assert user.updated_at is not None
-        if original_updated:
-            assert user.updated_at > original_updated
+        assert updated_at is not None
+        if user.updated_at:
+            assert updated_at > user.updated_at
 
     def test_category_activation(self):
         """Тест активации категорий."""
-        category = Category(
-            name="Тестовая категория",
-            description="Описание",
-            is_active=False
-        )
-
-        self.session.add(category)
-        self.session.commit()
+        category = self.session.execute(
+            insert(Category)
+            .values(name="Тестовая категория", description="Описание", is_active=False)
+            .returning(Category.id, Category.is_active)
+        ).one()
 
         assert not category.is_active
 
         # Активируем категорию.
-        category.is_active = True
-        self.session.commit()
+        is_active = self.session.execute(
+            update(Category)
+            .where(Category.id == category.id)
+            .values(is_active=True)
+            .returning(Category.is_active)
+        ).scalar_one()
 
-        assert category.is_active
+        assert is_active
 
-    def test_message_read_status(self):
+    def test_message_read_status(self, seeded):
         """Тест статуса прочтения сообщения."""
-        sender = User(telegram_id=666666666)
-        receiver = User(telegram_id=777777777)
-
-        self.session.add_all([sender, receiver])
-        self.session.commit()
-
-        message = Message(
-            content="Непрочитанное сообщение",
-            sender_id=sender.id,
-            receiver_id=receiver.id,
-            is_read=False
-        )
-
-        self.session.add(message)
-        self.session.commit()
+        message = self.session.execute(
+            insert(Message)
+            .values(
+                content="Непрочитанное сообщение",
+                sender_id=seeded.owner,
+                receiver_id=seeded.receiver,
+                is_read=False
+            )
+            .returning(Message.id, Message.is_read)
+        ).one()
 
         assert not message.is_read
 
         # Отмечаем как прочитанное.
-        message.is_read = True
-        self.session.commit()
+        is_read = self.session.execute(
+            update(Message)
+            .where(Message.id == message.id)
+            .values(is_read=True)
+            .returning(Message.is_read)
+        ).scalar_one()
 
-        assert message.is_read
+        assert is_read
 
-    def test_feedback_rating_validation(self):
+    def test_feedback_rating_validation(self, seeded):
         """Тест валидации рейтинга в отзывах."""
-        user = User(telegram_id=888888888)
-        self.session.add(user)
-        self.session.commit()
-
-        # Должны работать оценки от 1 до 5.
-        for rating in [1, 2, 3, 4, 5]:
-            feedback = Feedback(
-                user_id=user.id,
-                rating=rating,
-                type="bot"
-            )
-            self.session.add(feedback)
-
+        # Должны работать оценки от 1 до 5; все строки уходят одним пакетным INSERT.
+        self.session.add_all([
+            Feedback(user_id=seeded.owner, rating=rating, type="bot")
+            for rating in (1, 2, 3, 4, 5)
+        ])
         self.session.commit()
 
         # Проверяем что создалось 5 отзывов.
-        feedbacks = self.session.query(Feedback).filter_by(user_id=user.id).all()
+        feedbacks = self.session.query(Feedback).filter_by(user_id=seeded.owner).all()
         assert len(feedbacks) == 5
 
         # Проверяем рейтинги.
@@ -0,0 +1,69 @@
+"""
+Тесты валидации пользовательского ввода.
+"""
+import pytest
+
+from bot.utils import validator
+
+VALID_TITLES = ["Продам велосипед", "  Квартира в центре  ", "abc"]
+INVALID_TITLES = [
+    ("", "пустым"),
+    ("   ", "пустым"),
+    ("ab", "короткое"),
+    ("a" * 201, "длинное"),
+    ("Смотри https://example.com", "запрещенные"),
+    ("Пишите @seller", "запрещенные"),
+    ("#скидка дня", "запрещенные"),
+]
+
+VALID_PRICES = [("1000", 1000.0), ("1500,50", 1500.5), ("1 500 ₽", 1500.0)]
+INVALID_PRICES = [
+    ("-5", "меньше"),
+    ("2000000", "больше"),
+    ("inf", "Неверный формат"),
+]
+
+VALID_CONTACTS = ["@seller_01", "+7 999 123-45-67", "user@example.com"]
+INVALID_CONTACTS = [
+    ("", "пустой"),
+    ("ab", "короткая"),
+    ("напишите мне", "действительный контакт"),
+    ("@ab", "действительный контакт"),
+]
+
+
+class TestInputValidation:
+
+    @pytest.mark.parametrize("title", VALID_TITLES)
+    def test_valid_title(self, title):
+        is_valid, result = validator.validate_title(title)
+        assert is_valid and result == title.strip()
+
+    @pytest.mark.parametrize("title,expected_error", INVALID_TITLES)
+    def test_invalid_title(self, title, expected_error):
+        is_valid, result = validator.validate_title(title)
+        assert not is_valid
+        assert expected_error in result
+
+    @pytest.mark.parametrize("price,expected", VALID_PRICES)
+    def test_valid_price(self, price, expected):
+        assert validator.validate_price(price) == (True, expected)
+
+    @pytest.mark.parametrize("price,expected_error", INVALID_PRICES)
+    def test_invalid_price(self, price, expected_error):
+        is_valid, result = validator.validate_price(price)
+        assert not is_valid
+        assert expected_error in result
+
+    def test_price_without_digits(self):
+        assert validator.validate_price("abc") == (False, 0)
+
+    @pytest.mark.parametrize("contact", VALID_CONTACTS)
+    def test_valid_contact_info(self, contact):
+        assert validator.validate_contact_info(contact) == (True, contact)
+
+    @pytest.mark.parametrize("contact,expected_error", INVALID_CONTACTS)
+    def test_invalid_contact_info(self, contact, expected_error):
+        is_valid, result = validator.validate_contact_info(contact)
+        assert not is_valid
+        assert expected_error in result